@@ -10,60 +10,127 @@
 # Performance Optimizations (rsync mode):
 # - SSH connection multiplexing for faster subsequent connections
 # - Bulk transfers instead of individual file downloads
-# - Smart file filtering with include/exclude patterns
+# - Only the missing files are sent to rsync via a --files-from manifest
 # - Configurable compression levels and bandwidth limiting
-# - Optimized SSH cipher selection (AES-128-CTR)
-# - Partial transfer support with automatic resume
+# - Optimized SSH cipher selection (AES-128-GCM or ChaCha20-Poly1305)
+# - Interrupted rlogs resume where they stopped (--inplace --append-verify)
 # - Provides 2-5x faster transfer speeds vs individual file method
 
 import os
+import re
 import time
 import subprocess
-import paramiko
+import sys
 from pathlib import Path
 import io
 import stat
 import platform
-import json
+import functools
+import hashlib
+import shutil
+import base64
+import struct
+import fnmatch
+import socket
+import shlex
 import tempfile
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # ========= MODIFY THESE If you want to =========
-diroutbase = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rlogs")
-config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "devices_config.json")
+_BASE = Path(__file__).resolve().parent
+diroutbase = _BASE / "rlogs"
+config_file = _BASE / "devices_config.json"
 
 # Transfer method: "sftp" or "rsync"
 # rsync is generally faster and more efficient for large transfers
 transfer_method = "rsync"  # Change to "sftp" to use the original SFTP method
 
 # Rsync optimization settings (only used when transfer_method = "rsync")
-rsync_compress_level = 1  # 1-9, lower = faster but larger, higher = slower but smaller
+rsync_compress_level = 1  # 1-9, lower = faster but larger, higher = slower but smaller (skipped for .bz2/.zst rlogs)
 rsync_bandwidth_limit = 0  # KB/s, 0 = no limit (use for slower connections)
-rsync_whole_file = True  # Use whole-file transfers (faster for initial sync, slower for updates)
+rsync_resume_partial = True  # Write in place and resume interrupted rlogs with --append-verify
+
+# zstd level for stored rlogs: 1 for quick staging, 3 keeps up with downloads,
+# 15 is balanced and 19 archival (smallest files, compressed once, read many times)
+zstd_level = 3
+
+# Print per-file diagnostics: files compared, downloaded, moved or skipped
+# (summary and progress lines are always printed)
+verbose = False
 
 # These -probably- don't change
 remote_data_dir = "/data/media/0/realdata" # pretty sure this wont change
 # ====
 
+MANIFEST_NAME = ".manifest.json"  # per-dongle cache of remote path -> local filename
+
+# SFTP: parallel downloads per device (one channel each) and the receive window of each channel
+MAX_PARALLEL_DOWNLOADS = 8
+SFTP_WINDOW_SIZE = 2**27
+MAX_INFLIGHT_REQUESTS = 64  # pipelined READ requests per file download
+
+# Names of rlog files, plain and compressed (str.endswith accepts the tuple)
+RLOG_SUFFIXES = ("rlog", "rlog.zst", "rlog.gz", "rlog.bz2")
+
+# On the device an rlog's basename is exactly one of these; the find predicate
+# keeps rlogs.backup and the like out of the listing
+RLOG_BASENAME_RE = re.compile(r"rlog(\.(zst|gz|bz2))?")
+RLOG_FIND_PREDICATE = r"\( -name rlog -o -name 'rlog.*' \)"
+
+# What a DongleId read from the device must look like before it names a
+# directory in a remote shell command
+DONGLE_ID_RE = re.compile(r"[0-9a-f]+")
+
+print_lock = threading.Lock()  # keeps lines from concurrent downloads whole
+
+_config_dir_ready = False  # config_file's parent only needs creating once per process
+
+# Address prefixes of the local networks the downloader is allowed to run on
+HOME_NETWORK_PREFIXES = ("192.168.", "10.0.", "10.1.", "200.200.")
+
+@functools.lru_cache(maxsize=1)
 def is_on_home_wifi():
+    """Check whether this machine's primary address is on a home network.
+    
+    Connecting a UDP socket sends no packets; it only makes the OS pick the
+    egress interface, whose address is then read back. The result is cached
+    for the lifetime of the process.
+    """
     try:
-        if platform.system() == "Windows":
-            output = subprocess.check_output(["ipconfig"], shell=True).decode()
-        else:
-            output = subprocess.check_output(["ifconfig"]).decode()
-        
-        return any(x in output for x in ["192.168.", "10.0.", "10.1.", "200.200."])
-    except subprocess.CalledProcessError:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(("8.8.8.8", 80))
+            local_ip = sock.getsockname()[0]
+    except OSError:
         return False
+    
+    return local_ip.startswith(HOME_NETWORK_PREFIXES)
+
+# PATH lookup only, no process spawned
+RSYNC_PATH = shutil.which("rsync")
 
 def is_rsync_available():
-    """Check if rsync is available on the system and get version info."""
+    """Check if rsync is available on the system."""
+    return RSYNC_PATH is not None
+
+@functools.lru_cache(maxsize=1)
+def rsync_version():
+    """Return the first line of `rsync --version` (run once, only when it's displayed)."""
     try:
-        result = subprocess.run(["rsync", "--version"], capture_output=True, check=True, text=True)
-        version_line = result.stdout.split('\n')[0]
-        print(f"Found rsync: {version_line}")
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        result = subprocess.run([RSYNC_PATH, "--version"], capture_output=True, check=True, text=True)
+        return result.stdout.split('\n')[0]
+    except (subprocess.CalledProcessError, OSError, TypeError):
+        return "unknown version"
+
+# Common private key names
+SSH_KEY_PATTERNS = [
+    "id_rsa", "id_dsa", "id_ecdsa", "id_ed25519",
+    "*_rsa", "*_dsa", "*_ecdsa", "*_ed25519",
+    "*github*", "*gitlab*", "*bitbucket*",
+    "my_*_key", "*_key"
+]
+SSH_KEY_PATTERN_RE = re.compile("|".join(fnmatch.translate(pattern) for pattern in SSH_KEY_PATTERNS))
 
 def find_ssh_keys():
     """Find available SSH keys in the user's .ssh directory."""
@@ -71,42 +138,32 @@ def find_ssh_keys():
     if not os.path.exists(ssh_dir):
         return []
     
-    # Common private key names
-    key_patterns = [
-        "id_rsa", "id_dsa", "id_ecdsa", "id_ed25519",
-        "*_rsa", "*_dsa", "*_ecdsa", "*_ed25519",
-        "*github*", "*gitlab*", "*bitbucket*",
-        "my_*_key", "*_key"
-    ]
-    
     keys = []
-    for item in os.listdir(ssh_dir):
-        item_path = os.path.join(ssh_dir, item)
-        # Skip .pub files and directories
-        if item.endswith('.pub') or os.path.isdir(item_path):
-            continue
-        
-        # Check if it matches common key patterns or is a file without extension
-        is_key = False
-        for pattern in key_patterns:
-            if pattern.replace('*', '') in item.lower() or item == pattern.replace('*', ''):
-                is_key = True
-                break
-        
-        # Also include files that don't have extensions (common for SSH keys)
-        if not is_key and '.' not in item and os.path.isfile(item_path):
-            # Try to detect if it's likely an SSH key by reading first line
-            try:
-                with open(item_path, 'r', encoding='utf-8') as f:
-                    first_line = f.readline().strip()
-                    if 'PRIVATE KEY' in first_line or first_line.startswith('-----'):
-                        is_key = True
-            except (UnicodeDecodeError, PermissionError):
-                # Binary file or no permission, might still be a key
-                is_key = True
-        
-        if is_key:
-            keys.append(item_path)
+    with os.scandir(ssh_dir) as entries:
+        for entry in entries:
+            item = entry.name
+            # Skip .pub files and directories
+            if item.endswith('.pub') or not entry.is_file():
+                continue
+            
+            # Check if it matches common key patterns
+            is_key = SSH_KEY_PATTERN_RE.match(item.lower()) is not None
+            
+            # Also include files that don't have extensions (common for SSH keys)
+            if not is_key and '.' not in item:
+                # Try to detect if it's likely an SSH key from its PEM header
+                try:
+                    with open(entry.path, 'rb') as f:
+                        head = f.read(32)
+                    is_key = b'PRIVATE KEY' in head or head.startswith(b'-----')
+                except PermissionError:
+                    # No permission, might still be a key
+                    is_key = True
+                except OSError:
+                    pass
+            
+            if is_key:
+                keys.append(entry.path)
     
     return sorted(keys)
 
@@ -163,36 +220,60 @@ def select_ssh_key():
             except ValueError:
                 print("Please enter a valid number")
 
+@functools.lru_cache(maxsize=1)
+def json_codec():
+    """Return (loads, dumps) working on bytes, using orjson when it's installed.
+    
+    Imported on first use so startup doesn't pay for either module; dumps
+    takes an indent flag for files meant to be read by people.
+    """
+    try:
+        import orjson
+        
+        def dumps(obj, indent=False):
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.loads, dumps
+    except ImportError:
+        import json
+        
+        def dumps(obj, indent=False):
+            return json.dumps(obj, indent=2 if indent else None).encode()
+        return json.loads, dumps
+
 def load_device_config():
     """Load device configuration from JSON file."""
+    loads, _ = json_codec()
+    
     try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-            devices = config.get('devices', [])
-            
-            # Convert old format (tuples) to new format (dictionaries)
-            converted_devices = []
-            for device in devices:
-                if isinstance(device, (list, tuple)) and len(device) == 2:
-                    # Old format: (hostname, label)
-                    converted_devices.append({
-                        "hostname": device[0],
-                        "label": device[1],
-                        "username": "comma",  # Default username
-                        "ssh_key": os.path.expanduser("~/.ssh/id_rsa")  # Default key
-                    })
-                elif isinstance(device, dict):
-                    # New format: already a dictionary
-                    converted_devices.append(device)
-            
-            return converted_devices
-    except (FileNotFoundError, json.JSONDecodeError):
+        config = loads(config_file.read_bytes())
+        devices = config.get('devices', [])
+        
+        # Convert old format (tuples) to new format (dictionaries)
+        converted_devices = []
+        for device in devices:
+            if isinstance(device, (list, tuple)) and len(device) == 2:
+                # Old format: (hostname, label)
+                converted_devices.append({
+                    "hostname": device[0],
+                    "label": device[1],
+                    "username": "comma",  # Default username
+                    "ssh_key": os.path.expanduser("~/.ssh/id_rsa")  # Default key
+                })
+            elif isinstance(device, dict):
+                # New format: already a dictionary
+                converted_devices.append(device)
+        
+        return converted_devices
+    except (FileNotFoundError, ValueError):
         return []
 
 def save_device_config(devices):
     """Save device configuration to JSON file."""
+    global _config_dir_ready
     # Ensure the directory exists
-    os.makedirs(os.path.dirname(config_file), exist_ok=True)
+    if not _config_dir_ready:
+        os.makedirs(config_file.parent, exist_ok=True)
+        _config_dir_ready = True
     
     config = {
         "devices": devices,
@@ -201,8 +282,9 @@ def save_device_config(devices):
         "remote_data_dir": remote_data_dir
     }
     
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    _, dumps = json_codec()
+    # Indented: this file is meant to be readable and hand-editable
+    config_file.write_bytes(dumps(config, indent=True))
     
     print(f"Device configuration saved to: {config_file}")
 
@@ -364,19 +446,14 @@ def manage_device_config():
     
     return devices
 
+# Characters Windows rejects in filenames (plus path separators and control characters), mapped to '_'
+_SANITIZE = str.maketrans({char: '_' for char in '<>:"|?*/\\' + ''.join(map(chr, range(32)))})
+
 def sanitize_filename(filename):
     """Sanitize filename for Windows compatibility while preserving route structure."""
-    # Replace problematic characters for Windows
-    # Note: Windows doesn't allow | in filenames, so we use _ as a replacement
-    invalid_chars = '<>:"|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
-    
-    # Also replace any remaining path separators
-    filename = filename.replace('/', '_').replace('\\', '_')
-    
-    # Remove or replace problematic sequences
-    filename = filename.replace('..', '__')
+    # Replace problematic characters and path separators in one pass,
+    # then remove or replace problematic sequences
+    filename = filename.translate(_SANITIZE).replace('..', '__')
     
     # Ensure filename isn't too long (Windows has 260 char path limit)
     if len(filename) > 200:
@@ -385,8 +462,83 @@ def sanitize_filename(filename):
     
     return filename
 
+def local_rlog_name(dongle_id, relative_path):
+    """Map a path relative to remote_data_dir to its local name (dongle_id|route--filename).
+    
+    The route's '/' separators don't need joining with '|' first: sanitizing
+    turns both into '_' in the same single pass.
+    """
+    route, _, filename = relative_path.rpartition("/")
+    if route:
+        return sanitize_filename(f"{dongle_id}|{route}--{filename}")
+    return sanitize_filename(f"{dongle_id}--{filename}")
+
+# PEM header markers of the key formats that name their key type
+PEM_KEY_TYPES = {
+    b"RSA PRIVATE KEY": "RSAKey",
+    b"EC PRIVATE KEY": "ECDSAKey",
+    b"DSA PRIVATE KEY": "DSSKey",
+}
+OPENSSH_KEY_MAGIC = b"openssh-key-v1\0"
+
+def openssh_key_type(key_data):
+    """Return the key type string (e.g. 'ssh-ed25519') of an OpenSSH-format private key.
+    
+    The public key, and with it the key type, is stored unencrypted right after
+    the cipher/kdf header, so this works for passphrase-protected keys too.
+    """
+    lines = key_data.decode("ascii", errors="ignore").strip().splitlines()
+    blob = base64.b64decode("".join(line for line in lines if not line.startswith("-----")))
+    if not blob.startswith(OPENSSH_KEY_MAGIC):
+        return None
+    
+    offset = len(OPENSSH_KEY_MAGIC)
+    # Skip ciphername, kdfname and kdfoptions, then the key count
+    for _ in range(3):
+        offset += 4 + struct.unpack(">I", blob[offset:offset + 4])[0]
+    offset += 4
+    # Public key blob: length, then its first field is the key type string
+    offset += 4
+    type_length = struct.unpack(">I", blob[offset:offset + 4])[0]
+    return blob[offset + 4:offset + 4 + type_length].decode("ascii")
+
+def ssh_key_classes(ssh_key):
+    """Return the paramiko key classes to try for ssh_key, best guess first.
+    
+    Reading the key header lets us parse the file once with the right class
+    instead of trying Ed25519, RSA and ECDSA in turn.
+    """
+    import paramiko
+    
+    fallback = [paramiko.Ed25519Key, paramiko.RSAKey, paramiko.ECDSAKey]
+    try:
+        with open(ssh_key, 'rb') as f:
+            key_data = f.read()
+        
+        if b"OPENSSH PRIVATE KEY" in key_data[:64]:
+            key_type = openssh_key_type(key_data) or ""
+            if key_type == "ssh-ed25519":
+                return [paramiko.Ed25519Key]
+            if key_type == "ssh-rsa":
+                return [paramiko.RSAKey]
+            if key_type.startswith("ecdsa-sha2-"):
+                return [paramiko.ECDSAKey]
+            return fallback
+        
+        for marker, class_name in PEM_KEY_TYPES.items():
+            if marker in key_data[:64]:
+                key_class = getattr(paramiko, class_name, None)
+                return [key_class] if key_class else fallback
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        pass
+    return fallback
+
 def connect_ssh(host, username, ssh_key):
     """Connect to SSH with better error handling and Windows support."""
+    # Imported here: paramiko (and cryptography) is slow to load and only the
+    # SFTP method and the ssh fallback need it
+    import paramiko
+    
     client = paramiko.SSHClient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     
@@ -397,9 +549,9 @@ def connect_ssh(host, username, ssh_key):
         if ssh_key and os.path.exists(ssh_key):
             print(f"Connecting using SSH key: {ssh_key}")
             
-            # Try different key types for better Windows compatibility
+            # Try the detected key type (or every type if it can't be told)
             key_loaded = False
-            for key_class in [paramiko.Ed25519Key, paramiko.RSAKey, paramiko.ECDSAKey]:
+            for key_class in ssh_key_classes(ssh_key):
                 try:
                     if 'passphrase' in ssh_key or 'password' in ssh_key:
                         # Key might be password protected
@@ -451,16 +603,74 @@ def connect_ssh(host, username, ssh_key):
         print(f"Connection failed: {e}")
         raise
 
+@functools.lru_cache(maxsize=1)
+def has_aes_acceleration():
+    """Best-effort check for hardware AES support (AES-NI / ARMv8 crypto) on this machine."""
+    system = platform.system()
+    try:
+        if system == "Linux":
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    # x86 lists "flags", ARM lists "Features"
+                    if line.startswith(("flags", "Features")):
+                        return "aes" in line.split(":", 1)[1].split()
+        elif system == "Darwin":
+            if platform.machine() == "arm64":
+                return True  # All Apple Silicon has the ARMv8 crypto extensions
+            output = subprocess.check_output(["sysctl", "-n", "machdep.cpu.features"], text=True)
+            return "AES" in output.split()
+        elif system == "Windows":
+            # Every x86-64 CPU that can run a supported Windows has AES-NI
+            return platform.machine().lower() in ("amd64", "x86_64", "arm64")
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return False
+
+def ssh_cipher_option():
+    """Return the ssh -o value offering the fastest AEAD cipher for this machine first.
+    
+    AES-GCM fuses cipher and MAC and wins with AES hardware; without it,
+    ChaCha20-Poly1305 is faster. The server picks the first one it supports.
+    """
+    if has_aes_acceleration():
+        return "Ciphers=aes128-gcm@openssh.com,chacha20-poly1305@openssh.com,aes128-ctr"
+    return "Ciphers=chacha20-poly1305@openssh.com,aes128-gcm@openssh.com,aes128-ctr"
+
+def control_socket_path(device_host, username):
+    """Return the deterministic control socket path for username@device_host.
+    
+    A short hash keeps the path well under the unix socket length limit.
+    """
+    digest = hashlib.sha1(f"{username}@{device_host}".encode()).hexdigest()[:8]
+    return os.path.join(os.path.expanduser("~/.ssh"), "control_sockets", f"rsync_{digest}")
+
+def is_ssh_master_alive(control_socket):
+    """Check whether a multiplexing master is already listening on control_socket."""
+    if not os.path.exists(control_socket):
+        return False
+    try:
+        result = subprocess.run([
+            "ssh", "-o", f"ControlPath={control_socket}", "-O", "check", "dummy"
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+        return result.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
 def setup_ssh_multiplexing(device_host, username, ssh_key):
-    """Set up SSH connection multiplexing for faster subsequent connections."""
-    ssh_dir = os.path.expanduser("~/.ssh")
-    control_dir = os.path.join(ssh_dir, "control_sockets")
+    """Set up SSH connection multiplexing for faster subsequent connections.
     
-    # Create control socket directory if it doesn't exist
-    os.makedirs(control_dir, exist_ok=True)
+    The master is left running for an hour after its last use, so later runs
+    (and manual ssh calls using the same ControlPath) reuse it and skip the
+    TCP handshake and key exchange entirely.
+    """
+    control_socket = control_socket_path(device_host, username)
     
-    # Use a unique control socket for this device
-    control_socket = os.path.join(control_dir, f"rsync_{device_host}_{username}")
+    if is_ssh_master_alive(control_socket):
+        print(f"Reusing SSH connection multiplexing for {device_host}")
+        return control_socket
+    
+    # Create control socket directory if it doesn't exist
+    os.makedirs(os.path.dirname(control_socket), exist_ok=True)
     
     # Set up master connection
     master_cmd = [
@@ -469,8 +679,9 @@ def setup_ssh_multiplexing(device_host, username, ssh_key):
         "-o", "StrictHostKeyChecking=no",
         "-o", "ControlMaster=yes",
         "-o", f"ControlPath={control_socket}",
-        "-o", "ControlPersist=300",  # Keep connection alive for 5 minutes
+        "-o", "ControlPersist=3600",  # Keep connection alive for an hour after last use
         "-o", "Compression=no",
+        "-o", ssh_cipher_option(),
         "-o", "ServerAliveInterval=30",
         "-o", "TCPKeepAlive=yes",
         "-N",  # Don't execute a remote command
@@ -480,16 +691,24 @@ def setup_ssh_multiplexing(device_host, username, ssh_key):
     try:
         # Start master connection in background
         print(f"Setting up SSH connection multiplexing for {device_host}...")
-        subprocess.Popen(master_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        # Give it a moment to establish
-        time.sleep(2)
+        master = subprocess.Popen(master_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Give it up to 2 s to establish, returning as soon as the socket is
+        # there (with ControlPersist, ssh also exits once it has backgrounded)
+        deadline = time.monotonic() + 2
+        while (time.monotonic() < deadline and master.poll() is None
+               and not os.path.exists(control_socket)):
+            time.sleep(0.05)
         return control_socket
     except Exception as e:
         print(f"Warning: Could not set up SSH multiplexing: {e}")
         return None
 
 def cleanup_ssh_multiplexing(control_socket):
-    """Clean up SSH connection multiplexing."""
+    """Close a multiplexing master.
+    
+    Downloads deliberately leave masters running (see setup_ssh_multiplexing);
+    this is for tearing one down explicitly.
+    """
     if control_socket and os.path.exists(control_socket):
         try:
             # Close the master connection
@@ -504,8 +723,134 @@ def run_ssh_command(ssh, cmd):
     stdin, stdout, stderr = ssh.exec_command(cmd)
     return stdout.read().decode().strip(), stderr.read().decode().strip()
 
-def fetch_rlogs_rsync(device):
-    """Fetch rlogs using rsync (faster and more efficient than SFTP)."""
+_SSH_BATCH_SEPARATOR = "---8<---"
+
+def batch_ssh_commands(cmds):
+    """Join commands into one shell line, each one's output followed by a separator line."""
+    return "; ".join(f"{cmd}; echo; echo '{_SSH_BATCH_SEPARATOR}'" for cmd in cmds)
+
+def split_batched_output(output, count):
+    """Split the output of batch_ssh_commands() back into one string per command."""
+    parts = [part.strip() for part in (output + "\n").split(f"\n{_SSH_BATCH_SEPARATOR}\n")]
+    parts += [""] * (count - len(parts))
+    return parts[:count]
+
+def run_ssh_commands(ssh, cmds):
+    """Execute several commands in a single exec_command and return each one's stdout.
+    
+    One channel open and one network round-trip replace len(cmds) of them.
+    """
+    output, _ = run_ssh_command(ssh, batch_ssh_commands(cmds))
+    return split_batched_output(output, len(cmds))
+
+def start_ssh_cli_command(device_host, username, ssh_key, control_socket, cmd):
+    """Start a command with the ssh binary, reusing the multiplexed master if there is one.
+    
+    Returns the running process (or None if ssh couldn't be started) so the
+    caller can do local work while the device is busy; collect the result
+    with finish_ssh_cli_command().
+    """
+    ssh_cmd = [
+        "ssh",
+        "-i", ssh_key,
+        "-o", "StrictHostKeyChecking=no",
+        "-o", "BatchMode=yes",
+    ]
+    if control_socket:
+        ssh_cmd.extend(["-o", f"ControlPath={control_socket}"])
+    ssh_cmd.extend([f"{username}@{device_host}", cmd])
+    
+    try:
+        return subprocess.Popen(ssh_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True)
+    except OSError:
+        return None
+
+def finish_ssh_cli_command(process, input=None, timeout=300):
+    """Wait for a command started by start_ssh_cli_command() and return its stdout.
+    
+    input, if given, is sent to the remote command's stdin. Returns None if
+    ssh itself failed (e.g. the key needs a passphrase, which BatchMode
+    refuses to prompt for).
+    """
+    if process is None:
+        return None
+    try:
+        stdout, _ = process.communicate(input=input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return None
+    # 255 is ssh's own connection/authentication failure
+    if process.returncode == 255:
+        return None
+    return stdout.strip()
+
+def run_ssh_cli_command(device_host, username, ssh_key, control_socket, cmd, input=None):
+    """Execute a command with the ssh binary and return its stdout (None if ssh failed)."""
+    process = start_ssh_cli_command(device_host, username, ssh_key, control_socket, cmd)
+    return finish_ssh_cli_command(process, input=input)
+
+def stage_remote_rlogs(device_host, username, ssh_key, control_socket, stage_dir, files):
+    """Create symlinks named after the final local filenames in stage_dir on the device.
+    
+    files is a list of (path relative to remote_data_dir, local filename) pairs.
+    rsync (with --copy-links) can then transfer stage_dir flat, so files arrive
+    already named and need no per-file path mapping locally. Returns False if
+    the staging directory couldn't be built.
+    """
+    quoted_dir = shlex.quote(stage_dir)
+    stage_cmd = (
+        f"rm -rf {quoted_dir} && mkdir -p {quoted_dir} && cd {quoted_dir} && "
+        f"while IFS=\"$(printf '\\t')\" read -r src dst; do "
+        f"ln -s \"{remote_data_dir}/$src\" \"$dst\" || exit 1; done && echo staged"
+    )
+    pairs = "".join(f"{relative_path}\t{local_name}\n" for relative_path, local_name in files)
+    output = run_ssh_cli_command(device_host, username, ssh_key, control_socket, stage_cmd, input=pairs)
+    return output is not None and output.endswith("staged")
+
+# rsync output handling: progress updates end in \r, everything else in \n
+RSYNC_READ_SIZE = 64 * 1024
+RSYNC_LINE_SPLIT = re.compile(rb'[\r\n]')
+RSYNC_FILE_LINE = re.compile(rb'\.rlog(?:\.bz2)?$')
+RSYNC_STATUS_LINE = re.compile(rb'bytes/sec|%|^sent|^total size')
+
+# Suffixes rsync should never try to compress again, and the share of such
+# files above which compression is switched off entirely (it only costs
+# device CPU for already-compressed payloads)
+RSYNC_SKIP_COMPRESS = "bz2/gz/xz/zst"
+COMPRESSED_SUFFIXES = (".bz2", ".gz", ".xz", ".zst")
+COMPRESSED_SHARE_NO_Z = 0.8
+
+# rsync exit codes after which every transferred file is complete
+# (0 = success, 24 = some source files vanished before they could be sent)
+RSYNC_COMPLETE_EXIT_CODES = (0, 24)
+
+def should_compress_transfer(relative_paths):
+    """Decide whether rsync -z is worth it for the files about to be transferred."""
+    if not relative_paths:
+        return False
+    compressed = sum(1 for path in relative_paths if path.endswith(COMPRESSED_SUFFIXES))
+    return compressed / len(relative_paths) <= COMPRESSED_SHARE_NO_Z
+
+def print_rsync_line(line):
+    """Print an interesting line of rsync output; return 1 if it names a transferred rlog."""
+    line = line.strip()
+    if not line:
+        return 0
+    # Count successfully transferred files
+    if RSYNC_FILE_LINE.search(line):
+        print(f"  ✓ {line.decode(errors='replace')}")
+        return 1
+    if RSYNC_STATUS_LINE.search(line):
+        print(f"  {line.decode(errors='replace')}")
+    return 0
+
+def fetch_rlogs_rsync(device, on_file=None):
+    """Fetch rlogs using rsync (faster and more efficient than SFTP).
+    
+    on_file, if given, is called with the local path of each new rlog.
+    """
     device_host = device['hostname']
     label = device['label']
     username = device['username']
@@ -516,31 +861,54 @@ def fetch_rlogs_rsync(device):
     # Check if rsync is available
     if not is_rsync_available():
         print(f"{device_host} ({label}): rsync not available, falling back to SFTP")
-        return fetch_rlogs_sftp(device)
+        return fetch_rlogs_sftp(device, on_file)
     
     # Set up SSH connection multiplexing for faster transfers
     control_socket = setup_ssh_multiplexing(device_host, username, ssh_key)
     
+    print(f"{device_host} ({label}): Getting device status and list of remote files...")
+    # One round-trip for the params and the file listing. find prints paths
+    # relative to remote_data_dir, so no prefix stripping is needed.
+    status_cmds = [
+        "cat /data/params/d/DongleId",
+        "cat /data/params/d/IsOffroad",
+        f"find {remote_data_dir} {RLOG_FIND_PREDICATE} -type f -printf '%P\\n'",
+    ]
+    
+    # The ssh binary rides on the multiplexed master, so paramiko is only
+    # imported and connected when that fails
+    status_process = start_ssh_cli_command(device_host, username, ssh_key, control_socket,
+                                           batch_ssh_commands(status_cmds))
+    
+    # While the device runs find, list the rlogs we already have in every
+    # dongle folder known for this device (the dongle ID isn't known yet)
+    local_rlogs = {}
     try:
-        ssh = connect_ssh(device_host, username, ssh_key)
-    except Exception as e:
-        print(f"{device_host} ({label}): Connection failed: {e}")
-        cleanup_ssh_multiplexing(control_socket)
-        return
-
-    dongle_id, _ = run_ssh_command(ssh, "cat /data/params/d/DongleId")
-    is_offroad, _ = run_ssh_command(ssh, "cat /data/params/d/IsOffroad")
+        with os.scandir(Path(diroutbase) / label) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    local_rlogs[entry.name] = list_existing_rlogs(entry.path)
+    except FileNotFoundError:
+        pass
+    
+    status_output = finish_ssh_cli_command(status_process)
+    if status_output is None:
+        try:
+            ssh = connect_ssh(device_host, username, ssh_key)
+        except Exception as e:
+            print(f"{device_host} ({label}): Connection failed: {e}")
+            return
+        status_output, _ = run_ssh_command(ssh, batch_ssh_commands(status_cmds))
+        ssh.close()
+    
+    dongle_id, is_offroad, remote_files_output = split_batched_output(status_output, len(status_cmds))
 
     if is_offroad.strip() != "1":
         print(f"{device_host} ({label}): Skipping, device is onroad")
-        ssh.close()
-        cleanup_ssh_multiplexing(control_socket)
         return
 
     if not is_on_home_wifi():
         print(f"{device_host} ({label}): Not on home WiFi")
-        ssh.close()
-        cleanup_ssh_multiplexing(control_socket)
         return
 
     output_dir = Path(diroutbase) / label / dongle_id
@@ -550,52 +918,49 @@ def fetch_rlogs_rsync(device):
     temp_download_dir = output_dir / ".rsync_temp"
     temp_download_dir.mkdir(exist_ok=True)
     
-    print(f"{device_host} ({label}): Getting list of remote files...")
-    remote_files_cmd = f"find {remote_data_dir} -name '*rlog*' -type f"
-    remote_files_output, _ = run_ssh_command(ssh, remote_files_cmd)
-    
-    ssh.close()
+    # Parse remote files and check if we already have them (renamed); find's
+    # 'rlog.*' also matches names like rlog.lock, so keep the exact rlog names
+    remote_files = [path for path in remote_files_output.split('\n')
+                    if RLOG_BASENAME_RE.fullmatch(path.strip().rpartition("/")[2])]
     
-    # Parse remote files and check if we already have them (renamed)
-    remote_files = remote_files_output.strip().split('\n') if remote_files_output.strip() else []
-    existing_files = set()
+    # Build set of existing renamed files (usually listed already, above)
+    existing_files = local_rlogs.get(dongle_id)
+    if existing_files is None:
+        existing_files = list_existing_rlogs(output_dir)
     
-    # Build set of existing renamed files
-    for file_path in output_dir.glob('*rlog*'):
-        existing_files.add(file_path.name)
+    # Remote path -> local name mappings from previous runs; only new remote
+    # files need their expected name computed
+    manifest = load_manifest(output_dir)
+    manifest_size = len(manifest)
     
     # Check which files we actually need to download
     files_needed = []
     
     print(f"{device_host} ({label}): Analyzing which files we need...")
-    print(f"Sample existing files: {list(existing_files)[:3]}")
+    if verbose:
+        print(f"Sample existing files: {list(existing_files)[:3]}")
     
-    for remote_file in remote_files:
-        if not remote_file.strip():
+    for relative_path in remote_files:
+        if not relative_path.strip():
             continue
         
-        # Convert remote path to what the renamed file would be
-        relative_path = remote_file.replace(remote_data_dir + "/", "")
-        route_parts = relative_path.split("/")
-        filename = route_parts[-1]
-        
-        if len(route_parts) > 1:
-            route = "|".join(route_parts[:-1])
-            expected_filename = f"{dongle_id}|{route}--{filename}"
-        else:
-            expected_filename = f"{dongle_id}--{filename}"
-        
-        # Sanitize filename for Windows compatibility
-        expected_filename = sanitize_filename(expected_filename)
+        expected_filename = manifest.get(relative_path)
+        if expected_filename is None:
+            # Convert remote path to what the renamed file would be
+            expected_filename = local_rlog_name(dongle_id, relative_path)
+            manifest[relative_path] = expected_filename
         
         if expected_filename not in existing_files:
-            files_needed.append(remote_file)
+            files_needed.append(relative_path)
             
         # Debug: show first few comparisons
-        if len(files_needed) <= 3:
+        if verbose and len(files_needed) <= 3:
             status = 'MISSING' if expected_filename not in existing_files else 'EXISTS'
             print(f"Remote: {relative_path} -> Expected: {expected_filename} -> {status}")
     
+    if len(manifest) != manifest_size:
+        save_manifest(output_dir, manifest)
+    
     if not files_needed:
         print(f"{device_host} ({label}): All {len(remote_files)} files already exist, skipping rsync")
         # Clean up temp directory
@@ -603,46 +968,62 @@ def fetch_rlogs_rsync(device):
             temp_download_dir.rmdir()
         except OSError:
             pass
-        cleanup_ssh_multiplexing(control_socket)
         return
     
     print(f"{device_host} ({label}): Need to download {len(files_needed)} files out of {len(remote_files)} total")
     
+    # Have the device present the needed files under their final names so
+    # they land flat in the temp directory; if that fails (or the DongleId
+    # isn't safe to name a directory after), transfer the route tree as-is
+    # and rename locally afterwards
+    stage_dir = f"/tmp/rlog_stage_{dongle_id}"
+    if DONGLE_ID_RE.fullmatch(dongle_id) and stage_remote_rlogs(
+            device_host, username, ssh_key, control_socket, stage_dir,
+            [(path, manifest[path]) for path in files_needed]):
+        rsync_source_dir = stage_dir
+        transfer_list = [manifest[path] for path in files_needed]
+        route_dirs = set()  # everything lands flat in the temp directory
+    else:
+        print(f"{device_host} ({label}): Could not stage files on the device, renaming locally instead")
+        rsync_source_dir = remote_data_dir
+        transfer_list = files_needed
+        route_dirs = {path.split("/", 1)[0] for path in files_needed if "/" in path}
+    
     # Use optimized bulk rsync instead of individual file downloads
     print(f"{device_host} ({label}): Starting optimized bulk rsync transfer...")
     
-    # Create an include/exclude list for rsync to only download needed files
-    include_file = temp_download_dir / "rsync_includes.txt"
-    exclude_file = temp_download_dir / "rsync_excludes.txt"
-    
     try:
-        # Write include patterns for files we need
-        with open(include_file, 'w') as f:
-            # Include all directories leading to rlog files
-            f.write("+ */\n")  # Include all directories
-            # Include specific files we need
-            for needed_file in files_needed:
-                relative_path = needed_file.replace(remote_data_dir + "/", "")
-                f.write(f"+ {relative_path}\n")
-            # Exclude everything else
-            f.write("- *\n")
-        
-        # Optimized rsync command with performance improvements
+        # Optimized rsync command with performance improvements.
+        # The needed files are fed on stdin (--files-from), so rsync skips
+        # its own recursive scan and per-entry filter evaluation on the device.
         rsync_cmd = [
             "rsync",
-            "-avzP",  # archive, verbose, compress, progress
-            "--partial",  # keep partial transfers
-            "--partial-dir=.rsync-partial",  # partial transfer directory
+            "-avP",  # archive, verbose, progress, keep partial transfers
             "--preallocate",  # preallocate file space (faster on some filesystems)
-            f"--compress-level={rsync_compress_level}",  # configurable compression
             "--copy-links",  # copy symlinks as files
-            "--include-from", str(include_file),
-            "--delete-excluded",  # clean up excluded files in destination
+            "--files-from=-",  # read the list of needed files from stdin
+            "--from0",  # list entries are NUL-separated
         ]
         
         # Add conditional optimizations
-        if rsync_whole_file:
-            rsync_cmd.append("--whole-file")  # don't use delta transfer (faster for initial downloads)
+        if should_compress_transfer(files_needed):
+            rsync_cmd.extend([
+                "-z",  # compress
+                f"--compress-level={rsync_compress_level}",  # configurable compression
+                f"--skip-compress={RSYNC_SKIP_COMPRESS}",  # don't recompress compressed files
+            ])
+        
+        if rsync_resume_partial:
+            # rlogs are written sequentially, so an interrupted file is a prefix
+            # of the remote one: verify that prefix and only send the rest.
+            # (--inplace can't be combined with --partial-dir)
+            # Files that are already complete are skipped by --append-verify too.
+            rsync_cmd.extend(["--inplace", "--append-verify"])
+        else:
+            rsync_cmd.extend([
+                "--partial-dir=.rsync-partial",  # partial transfer directory
+                "--ignore-existing",  # never re-send a file left in the temp directory
+            ])
         
         if rsync_bandwidth_limit > 0:
             rsync_cmd.append(f"--bwlimit={rsync_bandwidth_limit}")
@@ -651,7 +1032,7 @@ def fetch_rlogs_rsync(device):
         ssh_opts = [
             "-o", "StrictHostKeyChecking=no",
             "-o", "Compression=no",  # Let rsync handle compression
-            "-o", "Cipher=aes128-ctr",  # Fast cipher
+            "-o", ssh_cipher_option(),  # Fastest AEAD cipher for this machine
             "-o", "ServerAliveInterval=30",  # Keep connection alive
             "-o", "TCPKeepAlive=yes"
         ]
@@ -662,7 +1043,7 @@ def fetch_rlogs_rsync(device):
         
         rsync_cmd.extend([
             f"--rsh=ssh -i \"{ssh_key}\" {' '.join(ssh_opts)}",
-            f"{username}@{device_host}:{remote_data_dir}/",
+            f"{username}@{device_host}:{rsync_source_dir}/",
             str(temp_download_dir) + "/"
         ])
         
@@ -676,209 +1057,315 @@ def fetch_rlogs_rsync(device):
         # Run rsync with real-time output
         process = subprocess.Popen(
             rsync_cmd,
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1
+            bufsize=0
         )
         
+        # Hand rsync the manifest and close stdin so it can build its file list
+        process.stdin.write(("\0".join(transfer_list) + "\0").encode())
+        process.stdin.close()
+        
+        # Read rsync's output in large chunks rather than one readline per
+        # progress update; os.read returns as soon as any data is available.
         files_downloaded = 0
-        for line in iter(process.stdout.readline, ''):
-            line = line.strip()
-            if line:
-                # Count successfully transferred files
-                if line.endswith('.rlog') or line.endswith('.rlog.bz2'):
-                    files_downloaded += 1
-                    print(f"  ✓ {line}")
-                elif 'bytes/sec' in line or '%' in line:
-                    print(f"  {line}")
-                elif line.startswith('sent') or line.startswith('total size'):
-                    print(f"  {line}")
+        stdout_fd = process.stdout.fileno()
+        pending = b""
+        while True:
+            chunk = os.read(stdout_fd, RSYNC_READ_SIZE)
+            if not chunk:
+                break
+            lines = RSYNC_LINE_SPLIT.split(pending + chunk)
+            pending = lines.pop()
+            for line in lines:
+                files_downloaded += print_rsync_line(line)
+        files_downloaded += print_rsync_line(pending)
         
+        process.stdout.close()
         process.wait()
         
         if process.returncode == 0:
             print(f"{device_host} ({label}): Bulk transfer completed successfully")
             print(f"{device_host} ({label}): Downloaded approximately {files_downloaded} files")
+        elif rsync_resume_partial and process.returncode not in RSYNC_COMPLETE_EXIT_CODES:
+            # Files are written in place, so an interrupted run leaves truncated
+            # rlogs under their final names. Keep them in the temp directory for
+            # the next run to resume rather than moving them into the archive.
+            print(f"{device_host} ({label}): rsync was interrupted (exit code: {process.returncode})")
+            print(f"{device_host} ({label}): Partial files kept in {temp_download_dir}, run again to resume")
+            return
         else:
             print(f"{device_host} ({label}): rsync completed with warnings/errors (exit code: {process.returncode})")
             print(f"{device_host} ({label}): This is often normal and doesn't indicate failure")
         
     except subprocess.CalledProcessError as e:
         print(f"{device_host} ({label}): rsync failed: {e}")
-        cleanup_ssh_multiplexing(control_socket)
         return
     except Exception as e:
         print(f"{device_host} ({label}): Error during rsync: {e}")
-        cleanup_ssh_multiplexing(control_socket)
         return
     finally:
-        # Clean up temporary files
-        try:
-            include_file.unlink()
-        except FileNotFoundError:
-            pass
-        try:
-            exclude_file.unlink()
-        except FileNotFoundError:
-            pass
+        # The staged symlinks are rebuilt on every run, so don't leave them on the device
+        if rsync_source_dir == stage_dir:
+            run_ssh_cli_command(device_host, username, ssh_key, control_socket, f"rm -rf {shlex.quote(stage_dir)}")
     
     # Rename files to match the original naming convention (dongle_id|route--filename)
     print(f"{device_host} ({label}): Moving and renaming files to final location...")
-    rename_and_move_rsync_files(temp_download_dir, output_dir, dongle_id)
+    rename_and_move_rsync_files(temp_download_dir, output_dir, dongle_id, route_dirs, on_file)
     
-    # Clean up temp directory and SSH multiplexing
+    # Clean up temp directory (the SSH master stays up for the next run)
     try:
         temp_download_dir.rmdir()
     except OSError as e:
         print(f"Warning: Could not remove temp directory {temp_download_dir}: {e}")
     
-    cleanup_ssh_multiplexing(control_socket)
 
-def rename_and_move_rsync_files(temp_dir, output_dir, dongle_id):
-    """Move files from temp directory and rename them to match the original SFTP naming convention."""
+def load_manifest(output_dir):
+    """Load the cached remote path -> local filename mapping for a dongle folder."""
+    loads, _ = json_codec()
     
-    # First, build a map of existing renamed files to avoid duplicates
-    existing_renamed = {}
-    for file_path in output_dir.glob('*rlog*'):
-        if not file_path.is_file():
+    try:
+        return loads((Path(output_dir) / MANIFEST_NAME).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    """Persist the remote path -> local filename mapping for a dongle folder."""
+    _, dumps = json_codec()
+    
+    try:
+        (Path(output_dir) / MANIFEST_NAME).write_bytes(dumps(manifest))
+    except OSError as e:
+        print(f"Warning: Could not save manifest in {output_dir}: {e}")
+
+def list_existing_rlogs(directory, prefix=""):
+    """Return the names of rlog files directly inside directory.
+    
+    Uses os.scandir so the file type comes from the cached dirent instead of
+    a stat() and Path object per entry.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries
+                    if entry.name.endswith(RLOG_SUFFIXES) and entry.name.startswith(prefix)
+                    and entry.is_file(follow_symlinks=False)}
+    except FileNotFoundError:
+        return set()
+
+def scan_file_groups(root, top_dirs=None):
+    """Yield (parts, file_entries) for root and every directory below it.
+    
+    parts is the directory's path relative to root as a tuple of names,
+    built up during the traversal so callers don't need relative_to().
+    If top_dirs is given, only those first-level directories are descended
+    into; every other subtree is skipped without being listed.
+    """
+    stack = [(os.fspath(root), ())]
+    while stack:
+        path, parts = stack.pop()
+        files = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if parts or top_dirs is None or entry.name in top_dirs:
+                            stack.append((entry.path, parts + (entry.name,)))
+                    elif entry.is_file():
+                        files.append(entry)
+        except OSError:
             continue
-        # If filename already contains dongle_id, it's already renamed
-        if file_path.name.startswith(dongle_id):
-            existing_renamed[file_path.name] = file_path
+        yield parts, files
+
+def rename_and_move_rsync_files(temp_dir, output_dir, dongle_id, route_dirs=None, on_file=None):
+    """Move files from temp directory and rename them to match the original SFTP naming convention.
+    
+    route_dirs limits the walk to the first-level directories rsync was
+    asked to fill (None walks everything). on_file is called with the new
+    path of every file moved.
+    """
+    
+    # First, build a set of existing renamed files to avoid duplicates
+    # (if filename already starts with dongle_id, it's already renamed).
+    # One scandir up front; after that duplicate checks are set lookups only.
+    existing_renamed = list_existing_rlogs(output_dir, prefix=dongle_id)
     
     files_moved = 0
     files_skipped = 0
+    out_str = os.fspath(output_dir)
     
-    for root, dirs, files in os.walk(temp_dir):
-        for file in files:
-            if "rlog" in file and not file.startswith('.rsync'):
-                current_path = Path(root) / file
-                # Get the relative path from the temp_dir
-                rel_path = current_path.relative_to(temp_dir)
-                
-                # Skip if this file is already in renamed format (shouldn't happen in temp dir)
-                if current_path.name.startswith(dongle_id):
-                    continue
-                
-                # Convert path to route format (replace / with |)
-                route_parts = list(rel_path.parts[:-1])  # All parts except filename
-                if route_parts:
-                    route = "|".join(route_parts)
-                    new_filename = f"{dongle_id}|{route}--{file}"
-                else:
-                    new_filename = f"{dongle_id}--{file}"
-                
+    visited_dirs = []
+    
+    for route_parts, entries in scan_file_groups(temp_dir, route_dirs):
+        visited_dirs.append(route_parts)
+        # Convert path to route format (replace / with |), once per directory
+        prefix = f"{dongle_id}|{'|'.join(route_parts)}--" if route_parts else f"{dongle_id}--"
+        route = "/".join(route_parts + ("",))
+        
+        for entry in entries:
+            file = entry.name
+            if not file.endswith(RLOG_SUFFIXES) or file.startswith('.rsync'):
+                continue
+            rel_path = route + file
+            
+            if file.startswith(dongle_id):
+                # Staged on the device under its final name already
+                new_filename = file
+            else:
                 # Sanitize filename for Windows compatibility
-                new_filename = sanitize_filename(new_filename)
-                
-                new_path = output_dir / new_filename
-                
-                # Check if target file already exists (prevents duplicates)
-                if new_filename in existing_renamed:
+                new_filename = sanitize_filename(prefix + file)
+            
+            # Check if target file already exists (prevents duplicates)
+            if new_filename in existing_renamed:
+                if verbose:
                     print(f"Target file already exists, skipping: {rel_path}")
-                    try:
-                        current_path.unlink()  # Remove the temp file
-                        files_skipped += 1
-                    except Exception as e:
-                        print(f"Failed to remove temp file {current_path}: {e}")
-                elif new_path.exists():
-                    print(f"Target file exists on disk, skipping: {rel_path}")
-                    try:
-                        current_path.unlink()  # Remove the temp file
-                        files_skipped += 1
-                    except Exception as e:
-                        print(f"Failed to remove temp file {current_path}: {e}")
-                else:
-                    try:
-                        current_path.rename(new_path)
-                        existing_renamed[new_filename] = new_path  # Track it
-                        files_moved += 1
+                try:
+                    os.unlink(entry.path)  # Remove the temp file
+                    files_skipped += 1
+                except Exception as e:
+                    print(f"Failed to remove temp file {entry.path}: {e}")
+            else:
+                new_path = os.path.join(out_str, new_filename)
+                try:
+                    os.replace(entry.path, new_path)
+                    existing_renamed.add(new_filename)  # Track it
+                    files_moved += 1
+                    if verbose:
                         print(f"Moved and renamed: {rel_path} → {new_filename}")
-                    except Exception as e:
-                        print(f"Failed to move and rename {current_path}: {e}")
+                except Exception as e:
+                    print(f"Failed to move and rename {entry.path}: {e}")
+                    continue
+                if on_file is not None:
+                    on_file(new_path)
     
     print(f"Files processed: {files_moved} moved, {files_skipped} skipped (duplicates)")
     
-    # Clean up empty directories in temp directory
-    for root, dirs, files in os.walk(temp_dir, topdown=False):
-        for dir_name in dirs:
-            dir_path = Path(root) / dir_name
+    # Clean up empty directories in temp directory, deepest first
+    # (rmdir only succeeds on an empty directory)
+    for route_parts in sorted(visited_dirs, key=len, reverse=True):
+        if route_parts:
             try:
-                if not any(dir_path.iterdir()):  # Directory is empty
-                    dir_path.rmdir()
+                os.rmdir(os.path.join(temp_dir, *route_parts))
             except OSError:
                 pass  # Directory not empty or other error
 
 def rename_rsync_files(output_dir, dongle_id, remote_data_dir):
     """Rename rsync'd files to match the original SFTP naming convention (legacy function)."""
     
-    # First, build a map of existing renamed files to avoid duplicates
-    existing_renamed = {}
-    for file_path in output_dir.glob('*rlog*'):
-        if not file_path.is_file():
-            continue
-        # If filename already contains dongle_id, it's already renamed
-        if file_path.name.startswith(dongle_id):
-            existing_renamed[file_path.name] = file_path
-    
-    for root, dirs, files in os.walk(output_dir):
-        for file in files:
-            if "rlog" in file:
-                current_path = Path(root) / file
-                # Get the relative path from the output_dir
-                rel_path = current_path.relative_to(output_dir)
-                
-                # Skip if this file is already in renamed format
-                if current_path.name.startswith(dongle_id):
-                    continue
-                
-                # Convert path to route format (replace / with |)
-                route_parts = list(rel_path.parts[:-1])  # All parts except filename
-                if route_parts:
-                    route = "|".join(route_parts)
-                    new_filename = f"{dongle_id}|{route}--{file}"
-                else:
-                    new_filename = f"{dongle_id}--{file}"
-                
-                # Sanitize filename for Windows compatibility
-                new_filename = sanitize_filename(new_filename)
-                
-                new_path = output_dir / new_filename
-                
-                # Check if target file already exists (prevents duplicates)
-                if new_filename in existing_renamed:
+    # First, build a set of existing renamed files to avoid duplicates
+    # (if filename already starts with dongle_id, it's already renamed)
+    existing_renamed = list_existing_rlogs(output_dir, prefix=dongle_id)
+    
+    files_renamed = 0
+    files_removed = 0
+    out_str = os.fspath(output_dir)
+    
+    visited_dirs = []
+    
+    for route_parts, entries in scan_file_groups(output_dir):
+        visited_dirs.append(route_parts)
+        # Convert path to route format (replace / with |), once per directory
+        prefix = f"{dongle_id}|{'|'.join(route_parts)}--" if route_parts else f"{dongle_id}--"
+        route = "/".join(route_parts + ("",))
+        
+        for entry in entries:
+            file = entry.name
+            # Skip if this file is already in renamed format
+            if not file.endswith(RLOG_SUFFIXES) or file.startswith(dongle_id):
+                continue
+            rel_path = route + file
+            
+            # Sanitize filename for Windows compatibility
+            new_filename = sanitize_filename(prefix + file)
+            
+            # Check if target file already exists (prevents duplicates)
+            if new_filename in existing_renamed:
+                if verbose:
                     print(f"Target file already exists, removing duplicate: {rel_path}")
-                    try:
-                        current_path.unlink()  # Remove the duplicate
-                    except Exception as e:
-                        print(f"Failed to remove duplicate {current_path}: {e}")
-                elif new_path.exists():
-                    print(f"Target file exists on disk, removing duplicate: {rel_path}")
-                    try:
-                        current_path.unlink()  # Remove the duplicate
-                    except Exception as e:
-                        print(f"Failed to remove duplicate {current_path}: {e}")
-                else:
-                    try:
-                        current_path.rename(new_path)
-                        existing_renamed[new_filename] = new_path  # Track it
+                try:
+                    os.unlink(entry.path)  # Remove the duplicate
+                    files_removed += 1
+                except Exception as e:
+                    print(f"Failed to remove duplicate {entry.path}: {e}")
+            else:
+                try:
+                    os.replace(entry.path, os.path.join(out_str, new_filename))
+                    existing_renamed.add(new_filename)  # Track it
+                    files_renamed += 1
+                    if verbose:
                         print(f"Renamed: {rel_path} → {new_filename}")
-                    except Exception as e:
-                        print(f"Failed to rename {current_path}: {e}")
+                except Exception as e:
+                    print(f"Failed to rename {entry.path}: {e}")
+    
+    print(f"Files processed: {files_renamed} renamed, {files_removed} removed (duplicates)")
     
-    # Clean up empty directories
-    for root, dirs, files in os.walk(output_dir, topdown=False):
-        for dir_name in dirs:
-            dir_path = Path(root) / dir_name
+    # Clean up empty directories, deepest first
+    # (rmdir only succeeds on an empty directory)
+    for route_parts in sorted(visited_dirs, key=len, reverse=True):
+        if route_parts:
             try:
-                if not any(dir_path.iterdir()):  # Directory is empty
-                    dir_path.rmdir()
+                os.rmdir(os.path.join(output_dir, *route_parts))
             except OSError:
                 pass  # Directory not empty or other error
 
-def fetch_rlogs_sftp(device):
-    """Fetch rlogs using SFTP (original method)."""
+@functools.lru_cache(maxsize=1)
+def sftp_prefetch_limit_supported():
+    """Whether this paramiko's SFTPFile.prefetch() can cap its requests (added in paramiko 3.3)."""
+    import inspect
+    import paramiko
+    return "max_concurrent_requests" in inspect.signature(paramiko.SFTPFile.prefetch).parameters
+
+def sftp_download(sftp, remote_path, local_file, file_size):
+    """Download remote_path (file_size bytes, known from the listing) into local_file.
+    
+    Prefetching keeps many READ requests in flight instead of waiting a
+    round trip per chunk; paramiko puts the replies back in offset order.
+    Where supported, at most MAX_INFLIGHT_REQUESTS are outstanding so a
+    large rlog can't queue unbounded replies in memory. Unlike getfo(),
+    this doesn't stat the remote file first, and it hands the data on in
+    COPY_BUFFER_SIZE pieces rather than 32 KiB ones.
+    """
+    with sftp.open(remote_path, 'rb') as remote_file:
+        if sftp_prefetch_limit_supported():
+            remote_file.prefetch(file_size, MAX_INFLIGHT_REQUESTS)
+        else:
+            remote_file.prefetch(file_size)
+        shutil.copyfileobj(remote_file, local_file, length=COPY_BUFFER_SIZE)
+
+def preallocate(f, size):
+    """Reserve size bytes for the open file f so it isn't extended write by write.
+    
+    Best effort: posix_fallocate doesn't exist on Windows or macOS, and some
+    filesystems refuse it.
+    """
+    if size > 0 and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError:
+            pass
+
+def list_remote_rlogs(ssh):
+    """List the rlogs under remote_data_dir as (relative_path, size) pairs.
+    
+    One find over SSH returns every path and size in a single round trip,
+    instead of an SFTP listdir round trip per route directory.
+    """
+    output, error = run_ssh_command(
+        ssh, f"find {remote_data_dir} {RLOG_FIND_PREDICATE} -type f -printf '%P\\t%s\\n'")
+    if error:
+        print(f"Error listing remote rlogs: {error}")
+    rlogs = []
+    for line in output.splitlines():
+        relative_path, _, size = line.rpartition("\t")
+        if RLOG_BASENAME_RE.fullmatch(relative_path.rpartition("/")[2]):
+            rlogs.append((relative_path, int(size)))
+    return rlogs
+
+def fetch_rlogs_sftp(device, on_file=None):
+    """Fetch rlogs using SFTP (original method).
+    
+    on_file, if given, is called with the local path of each new rlog.
+    """
     device_host = device['hostname']
     label = device['label']
     username = device['username']
@@ -891,8 +1378,10 @@ def fetch_rlogs_sftp(device):
         print(f"{device_host} ({label}): Connection failed: {e}")
         return
 
-    dongle_id, _ = run_ssh_command(ssh, "cat /data/params/d/DongleId")
-    is_offroad, _ = run_ssh_command(ssh, "cat /data/params/d/IsOffroad")
+    dongle_id, is_offroad = run_ssh_commands(ssh, [
+        "cat /data/params/d/DongleId",
+        "cat /data/params/d/IsOffroad",
+    ])
 
     if is_offroad.strip() != "1":
         print(f"{device_host} ({label}): Skipping, device is onroad")
@@ -902,79 +1391,111 @@ def fetch_rlogs_sftp(device):
         print(f"{device_host} ({label}): Not on home WiFi")
         return
 
-    sftp = ssh.open_sftp()
+    # Open every SFTP channel with a larger window so more data is in flight
+    ssh.get_transport().default_window_size = SFTP_WINDOW_SIZE
     output_dir = Path(diroutbase) / label / dongle_id
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    def walk_rlog_files(path):
-        try:
-            for dirpath, dirnames, filenames in sftp_walk(sftp, path):
-                for file in filenames:
-                    if "rlog" in file:
-                        # Use forward slashes for remote paths
-                        yield dirpath.rstrip('/') + '/' + file
-        except Exception as e:
-            print(f"Error walking remote path: {e}")
+    # Each download thread gets its own SFTP channel on the same connection
+    thread_state = threading.local()
+    channels = []
 
-    import stat
+    def thread_sftp():
+        if not hasattr(thread_state, 'sftp'):
+            thread_state.sftp = ssh.open_sftp()
+            channels.append(thread_state.sftp)
+        return thread_state.sftp
 
-    def sftp_walk(sftp, remotepath):
-        """Walk through SFTP directory structure with Windows compatibility."""
-        path_stack = [remotepath]
-        while path_stack:
-            current_path = path_stack.pop()
-            try:
-                files = []
-                folders = []
-                for entry in sftp.listdir_attr(current_path):
-                    fname = entry.filename
-                    # Use forward slashes for remote paths (Unix-style)
-                    fullpath = current_path.rstrip('/') + '/' + fname
-                    if stat.S_ISDIR(entry.st_mode):
-                        folders.append(fullpath)
-                    else:
-                        files.append(fname)
-                yield current_path, folders, files
-                path_stack.extend(folders)
-            except IOError:
-                continue
+    # Uncompressed rlogs are compressed on the way in when the zstandard
+    # binding is available, so they never touch the disk uncompressed
+    compress_on_download = zstandard_available()
 
-    for filepath in walk_rlog_files(remote_data_dir):
-        route = filepath.replace(remote_data_dir + "/", "").rsplit("/", 1)[0]
-        filename = filepath.rsplit("/", 1)[-1]
-        local_filename = f"{dongle_id}|{route}--{filename}"
-        
-        # Sanitize filename for Windows compatibility
-        local_filename = sanitize_filename(local_filename)
-        
-        local_path = output_dir / local_filename
-        if local_path.exists():
-            continue
+    def download(filepath, file_size, local_path, local_filename):
         try:
-            print(f"Downloading {filepath} → {local_filename}")
-            
-            # Show file size for progress indication (if available)
+            if verbose:
+                with print_lock:
+                    print(f"Downloading {filepath} → {local_filename} ({file_size / (1024*1024):.1f} MB)")
+            if compress_on_download and local_filename.endswith("rlog"):
+                local_path += ".zst"
+                compressor = acquire_zstd_compressor()
+                with compressor.stream_writer(open(local_path, 'wb', buffering=WRITE_BUFFER_SIZE)) as writer:
+                    sftp_download(thread_sftp(), filepath, writer, file_size)
+                _zstd_compressors.put(compressor)
+            else:
+                with open(local_path, 'wb') as f:
+                    preallocate(f, file_size)
+                    sftp_download(thread_sftp(), filepath, f, file_size)
+                    f.truncate()  # drop any preallocated tail if the file came up short
+            if on_file is not None:
+                on_file(local_path)
+            return True
+        except Exception as e:
+            with print_lock:
+                print(f"Failed to download {filepath}: {e}")
+            # Don't leave a partial file that would be skipped next run
             try:
-                file_stat = sftp.stat(filepath)
-                file_size = file_stat.st_size
-                print(f"  File size: {file_size / (1024*1024):.1f} MB")
-            except:
+                os.remove(local_path)
+            except OSError:
                 pass
-                
-            sftp.get(filepath, str(local_path))
-            print(f"  ✓ Download completed")
-        except Exception as e:
-            print(f"Failed to download {filepath}: {e}")
+            return False
 
-    sftp.close()
+    # One scandir for everything already downloaded instead of stat calls per file
+    existing = list_existing_rlogs(output_dir)
+    output_prefix = os.path.join(output_dir, "")  # local paths are joined as plain strings
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as executor:
+        futures = {}
+        for relative_path, file_size in list_remote_rlogs(ssh):
+            filepath = f"{remote_data_dir}/{relative_path}"
+            local_filename = local_rlog_name(dongle_id, relative_path)
+            
+            # Also skip rlogs already stored compressed (here or by compress_unzipped_rlogs)
+            if any(local_filename + suffix in existing for suffix in ("", ".zst", ".gz")):
+                continue
+            existing.add(local_filename)
+            local_path = output_prefix + local_filename
+            futures[executor.submit(download, filepath, file_size, local_path, local_filename)] = local_filename
+
+        for i, future in enumerate(as_completed(futures), 1):
+            if future.result():
+                with print_lock:
+                    print(f"  ✓ [{i}/{len(futures)}] Download completed: {futures[future]}")
+
+    for channel in channels:
+        channel.close()
     ssh.close()
 
-def fetch_rlogs(device):
+def fetch_rlogs(device, on_file=None):
     """Fetch rlogs using the configured transfer method."""
     if transfer_method.lower() == "rsync":
-        fetch_rlogs_rsync(device)
+        fetch_rlogs_rsync(device, on_file)
     else:
-        fetch_rlogs_sftp(device)
+        fetch_rlogs_sftp(device, on_file)
+
+def fetch_all(devices, max_workers=None, on_file=None):
+    """Fetch rlogs from several devices concurrently, one worker thread per device.
+    
+    on_file is called (from the worker threads) with the local path of each new rlog.
+    """
+    if not devices:
+        return
+    if max_workers is None:
+        max_workers = min(8, len(devices))
+    
+    # Keep lines from different devices whole when stdout is a pipe or file
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
+    
+    # Each device is an independent SSH endpoint and the work is I/O-bound
+    # (paramiko sockets, rsync subprocesses), so threads are sufficient.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_rlogs, device, on_file): device for device in devices}
+        for future in as_completed(futures):
+            device = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"{device['hostname']} ({device['label']}): Fetch failed: {e}")
 
 def format_size(size_bytes):
     """Format file size in human-readable format."""
@@ -988,32 +1509,206 @@ def format_size(size_bytes):
         size_index += 1
     return f"{size:.2f} {size_names[size_index]}"
 
-def get_folder_size(folder_path):
-    """Calculate total size of all files in a folder and its subfolders."""
-    total_size = 0
+# zstd settings: the level comes from zstd_level above (1-19; 20+ would need
+# --ultra), threads 0 means every core, and the long-distance window (2**27 =
+# 128 MiB, still within a default decoder's limit) finds repeats across a whole rlog
+ZSTD_LEVEL = min(max(int(zstd_level), 1), 19)
+ZSTD_THREADS = 0
+ZSTD_WINDOW_LOG = 27
+ZSTD_BATCH_SIZE = 64
+MAX_COMPRESS_WORKERS = os.cpu_count() or 1  # files compressed at once by the worker pool
+COPY_BUFFER_SIZE = 1024 * 1024  # read size when feeding the gzip compressor
+WRITE_BUFFER_SIZE = 128 * 1024  # output buffer, so small compressed chunks are coalesced
+
+def compress_rlogs_with_zstd_cli(paths):
+    """Compress rlog files with the zstd tool, many files per invocation.
+    
+    Yields (compressed_size, error) for each path, in order. zstd threads
+    internally (ZSTD_THREADS), so these batches run one at a time.
+    """
+    for start in range(0, len(paths), ZSTD_BATCH_SIZE):
+        batch = paths[start:start + ZSTD_BATCH_SIZE]
+        try:
+            result = subprocess.run(["zstd", "--rm", "-f", f"-T{ZSTD_THREADS}", f"-{ZSTD_LEVEL}",
+                                     f"--long={ZSTD_WINDOW_LOG}", *batch],
+                                    capture_output=True, text=True)
+            stderr_lines = result.stderr.strip().splitlines()
+            error = stderr_lines[-1] if stderr_lines else f"zstd exited with code {result.returncode}"
+        except OSError as e:
+            error = str(e)
+        
+        # Stat the outputs with one scandir per directory in the batch
+        compressed_sizes = {}
+        for directory in {os.path.dirname(path) for path in batch}:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        compressed_sizes[entry.path] = entry.stat().st_size if entry.name.endswith(".zst") else None
+            except OSError:
+                pass
+        
+        for path in batch:
+            # --rm only removes the original once its .zst is complete
+            if path not in compressed_sizes and compressed_sizes.get(path + ".zst") is not None:
+                yield compressed_sizes[path + ".zst"], None
+            else:
+                yield 0, error
+
+_zstd_compressors = queue.SimpleQueue()  # idle zstandard compressors in this process
+
+@functools.lru_cache(maxsize=1)
+def zstandard_available():
+    """Whether the zstandard binding can be imported."""
     try:
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if os.path.exists(file_path):
-                    total_size += os.path.getsize(file_path)
+        import zstandard
+        return True
+    except ImportError:
+        return False
+
+def acquire_zstd_compressor():
+    """Take an idle zstandard compressor, creating one if none is free.
+    
+    Reusing compressors keeps their (large, long-window) contexts instead of
+    allocating new ones for every file; return them to _zstd_compressors.
+    """
+    try:
+        return _zstd_compressors.get_nowait()
+    except queue.Empty:
+        import zstandard
+        params = zstandard.ZstdCompressionParameters.from_level(
+            ZSTD_LEVEL, window_log=ZSTD_WINDOW_LOG, enable_ldm=True)
+        return zstandard.ZstdCompressor(compression_params=params)
+
+def compress_rlog_file(full_path, method):
+    """Compress a single rlog file and remove the original.
+    
+    method is "zstandard" (Python binding) or "gzip". Runs in a worker
+    process, so it reports back instead of printing: returns
+    (compressed_size, None) on success or (0, error).
+    """
+    compressed_path = full_path + (".zst" if method == "zstandard" else ".gz")
+    try:
+        # Unbuffered input: reads go straight into the compressor's buffer
+        with open(full_path, 'rb', buffering=0) as f_in, open(compressed_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f_out:
+            if method == "zstandard":
+                compressor = acquire_zstd_compressor()
+                compressor.copy_stream(f_in, f_out, read_size=WRITE_BUFFER_SIZE, write_size=WRITE_BUFFER_SIZE)
+                # Only a compressor that finished cleanly goes back for reuse
+                _zstd_compressors.put(compressor)
+            else:
+                import gzip
+                # Read into one reused buffer instead of a new bytes object per chunk
+                buffer = bytearray(COPY_BUFFER_SIZE)
+                view = memoryview(buffer)
+                with gzip.GzipFile(fileobj=f_out, mode='wb', compresslevel=6) as gz_out:
+                    n = f_in.readinto(buffer)
+                    while n:
+                        gz_out.write(view[:n])
+                        n = f_in.readinto(buffer)
+            # Everything has been written, so the position is the compressed size
+            compressed_size = f_out.tell()
+        
+        # Remove original file after successful compression
+        os.remove(full_path)
+        return compressed_size, None
     except Exception as e:
-        print(f"Error calculating folder size for {folder_path}: {e}")
-    return total_size
+        # Remove incomplete compressed file if it exists
+        try:
+            os.remove(compressed_path)
+        except OSError:
+            pass
+        return 0, str(e)
 
-def compress_unzipped_rlogs(base_dir):
-    import gzip
-    import shutil
-    from collections import defaultdict
+def snapshot_tree(root, snapshot):
+    """Yield (entry, size, hidden) for every file under root, recording each listing in snapshot.
+    
+    snapshot maps a directory path to {name: (size, is_dir)}, so one walk
+    can feed both compression and the size report. hidden is True for
+    files below a hidden directory.
+    """
+    stack = [(os.fspath(root), False)]
+    while stack:
+        path, hidden = stack.pop()
+        listing = snapshot[path] = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        listing[entry.name] = (0, True)
+                        stack.append((entry.path, hidden or entry.name.startswith('.')))
+                    elif entry.is_file():
+                        try:
+                            size = entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            size = 0
+                        listing[entry.name] = (size, False)
+                        yield entry, size, hidden
+        except OSError:
+            del snapshot[path]
+
+def iter_uncompressed_rlogs(base_dir, snapshot):
+    """Yield (full_path, size, device_label) for every uncompressed rlog under base_dir.
+    
+    Hidden directories hold in-progress rsync transfers, which must be left alone.
+    """
+    for entry, file_size, hidden in snapshot_tree(base_dir, snapshot):
+        if not hidden and entry.name.endswith("rlog"):
+            yield entry.path, file_size, rlog_device_label(entry.path, base_dir)
+
+def select_compression_method():
+    """Pick the compressor: "zstandard", "zstd" or "gzip".
     
-    # Check if zstd is available first (best compression)
-    zstd_available = False
+    Prefer zstd (best compression): the Python binding avoids a process
+    per file, the command line tool is next, gzip is always available.
+    """
+    if zstandard_available():
+        print("Using zstd compression...")
+        return "zstandard"
     try:
         subprocess.run(["zstd", "--version"], capture_output=True, check=True)
-        zstd_available = True
         print("Using zstd compression...")
+        return "zstd"
     except (subprocess.CalledProcessError, FileNotFoundError):
         print("zstd not found, using built-in gzip compression...")
+        return "gzip"
+
+def make_compression_executor(method):
+    """Return a worker pool for compress_rlog_file, or None for the batched zstd tool."""
+    if method == "zstd":
+        return None
+    if method == "gzip":
+        # zlib releases the GIL while deflating, so threads scale nearly as
+        # well as processes without the start-up and pickling cost
+        return ThreadPoolExecutor(max_workers=MAX_COMPRESS_WORKERS)
+    from concurrent.futures import ProcessPoolExecutor
+    # Workers are started on first use, from fetch threads while paramiko and
+    # rsync reader threads run; forking then can copy a lock another thread
+    # holds, so start them fresh (mp_context is new in Python 3.7)
+    if sys.version_info < (3, 7):
+        return ProcessPoolExecutor(max_workers=MAX_COMPRESS_WORKERS)
+    import multiprocessing
+    return ProcessPoolExecutor(max_workers=MAX_COMPRESS_WORKERS,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+def rlog_device_label(full_path, base_dir):
+    """Return the device folder (first path component under base_dir) holding full_path."""
+    rel_path = os.path.relpath(os.path.dirname(full_path), base_dir)
+    return rel_path.split(os.sep)[0] if os.sep in rel_path else rel_path
+
+def compress_unzipped_rlogs(base_dir, method=None, executor=None, submitted=()):
+    """Compress every uncompressed rlog under base_dir, then report device sizes.
+    
+    When files were already handed to a compressor while downloading (see
+    main), pass its method and executor plus the submitted
+    ((full_path, size, device_label), future) pairs; their results are
+    included here and those files are not compressed again.
+    """
+    from collections import defaultdict
+    
+    if method is None:
+        method = select_compression_method()
+    method_name = "gzip" if method == "gzip" else "zstd"
+    compressed_suffix = ".gz" if method == "gzip" else ".zst"
     
     # Track compression statistics per device
     device_stats = defaultdict(lambda: {
@@ -1023,88 +1718,64 @@ def compress_unzipped_rlogs(base_dir):
         'compression_errors': 0
     })
     
-    # First pass: collect all uncompressed rlog files and their sizes
-    files_to_compress = []
-    for root, dirs, files in os.walk(base_dir):
-        for file in files:
-            if file.endswith("rlog"):
-                full_path = os.path.join(root, file)
-                try:
-                    file_size = os.path.getsize(full_path)
-                    # Extract device info from path structure
-                    rel_path = os.path.relpath(root, base_dir)
-                    device_label = rel_path.split(os.sep)[0] if os.sep in rel_path else rel_path
-                    files_to_compress.append((full_path, file_size, device_label))
-                except Exception as e:
-                    print(f"Error getting size for {full_path}: {e}")
-    
-    if not files_to_compress:
-        print("No uncompressed rlog files found.")
-        # Still report current device sizes
-        report_device_sizes_after_compression(base_dir)
-        return
+    owns_executor = executor is None
+    if owns_executor:
+        executor = make_compression_executor(method)
     
-    total_files = len(files_to_compress)
-    print(f"Found {total_files} uncompressed rlog files to process...")
-    
-    # Compress files and track statistics
-    for i, (full_path, original_size, device_label) in enumerate(files_to_compress, 1):
-        print(f"[{i}/{total_files}] Processing: {os.path.basename(full_path)} ({format_size(original_size)})")
+    try:
+        # Collect all uncompressed rlog files and their sizes; with a worker
+        # pool each file is queued as soon as it is found, so compression
+        # runs while the rest of the tree is still being scanned
+        files_to_compress = [item for item, _ in submitted]
+        futures = [future for _, future in submitted]
+        already_submitted = {full_path for full_path, _, _ in files_to_compress}
+        snapshot = {}  # the whole tree, kept current below and reused by the size report
+        for item in iter_uncompressed_rlogs(base_dir, snapshot):
+            if item[0] in already_submitted:
+                continue
+            files_to_compress.append(item)
+            if executor is not None:
+                futures.append(executor.submit(compress_rlog_file, item[0], method))
         
-        device_stats[device_label]['original_size'] += original_size
+        if not files_to_compress:
+            print("No uncompressed rlog files found.")
+            # Still report current device sizes
+            report_device_sizes_after_compression(base_dir, snapshot)
+            return
         
-        success = False
-        compressed_size = 0
+        total_files = len(files_to_compress)
+        print(f"Found {total_files} uncompressed rlog files to process...")
         
-        if zstd_available:
-            # Use zstd if available
-            try:
-                # On Windows, handle path quoting for subprocess
-                if platform.system() == "Windows":
-                    result = subprocess.run(["zstd", "--rm", "-f", str(full_path)], 
-                                          check=True, shell=True, capture_output=True)
-                else:
-                    result = subprocess.run(["zstd", "--rm", "-f", full_path], 
-                                          check=True, capture_output=True)
-                
-                # Check for compressed file
-                compressed_path = full_path + ".zst"
-                if os.path.exists(compressed_path):
-                    compressed_size = os.path.getsize(compressed_path)
-                    success = True
-                    print(f"  ✓ Compressed with zstd: {format_size(original_size)} → {format_size(compressed_size)} ({compressed_size/original_size*100:.1f}%)")
-                
-            except subprocess.CalledProcessError as e:
-                print(f"  ✗ Failed to compress with zstd: {e}")
-                device_stats[device_label]['compression_errors'] += 1
+        # Track statistics as results come back, in the order files were found
+        if executor is None:
+            results = compress_rlogs_with_zstd_cli([full_path for full_path, _, _ in files_to_compress])
         else:
-            # Use Python's built-in gzip compression
-            compressed_path = full_path + ".gz"
-            try:
-                with open(full_path, 'rb') as f_in:
-                    with gzip.open(compressed_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                
-                if os.path.exists(compressed_path):
-                    compressed_size = os.path.getsize(compressed_path)
-                    success = True
-                    # Remove original file after successful compression
-                    os.remove(full_path)
-                    print(f"  ✓ Compressed with gzip: {format_size(original_size)} → {format_size(compressed_size)} ({compressed_size/original_size*100:.1f}%)")
+            results = (future.result() for future in futures)
+        
+        for i, ((full_path, original_size, device_label), (compressed_size, error)) in enumerate(
+                zip(files_to_compress, results), 1):
+            print(f"[{i}/{total_files}] Processed: {os.path.basename(full_path)} ({format_size(original_size)})")
+            
+            device_stats[device_label]['original_size'] += original_size
+            
+            if error is None:
+                ratio = compressed_size / original_size * 100 if original_size else 100.0
+                print(f"  ✓ Compressed with {method_name}: {format_size(original_size)} → {format_size(compressed_size)} ({ratio:.1f}%)")
+                device_stats[device_label]['files_compressed'] += 1
+                device_stats[device_label]['compressed_size'] += compressed_size
                 
-            except Exception as e:
-                print(f"  ✗ Failed to compress with gzip: {e}")
+                # The walk may have seen this file before or after it was compressed
+                directory, file_name = os.path.split(full_path)
+                listing = snapshot.get(directory)
+                if listing is not None:
+                    listing.pop(file_name, None)
+                    listing[file_name + compressed_suffix] = (compressed_size, False)
+            else:
+                print(f"  ✗ Failed to compress with {method_name}: {error}")
                 device_stats[device_label]['compression_errors'] += 1
-                # Remove incomplete compressed file if it exists
-                if os.path.exists(compressed_path):
-                    try:
-                        os.remove(compressed_path)
-                    except:
-                        pass
-        
-        if success:
-            device_stats[device_label]['files_compressed'] += 1
-            device_stats[device_label]['compressed_size'] += compressed_size
+    finally:
+        if owns_executor and executor is not None:
+            executor.shutdown()
     
     # Print compression summary
     print("\n" + "="*60)
@@ -1149,10 +1820,77 @@ def compress_unzipped_rlogs(base_dir):
     
     # Report final device sizes after compression
     print("\n" + "="*60)
-    report_device_sizes_after_compression(base_dir)
+    report_device_sizes_after_compression(base_dir, snapshot)
+
+# Report categories of compressed rlogs (name.rlog.<ext>), keyed by the last extension
+COMPRESSED_RLOG_CATEGORIES = {'zst': 'rlog.zst', 'gz': 'rlog.gz', 'bz2': 'rlog.bz2'}
+
+def rlog_category(filename):
+    """Return the report category of a file: its rlog compression type or 'other'."""
+    # One rpartition and a dict lookup instead of an endswith() per category
+    base, dot, ext = filename.rpartition('.')
+    if dot and ext == 'rlog':
+        return 'rlog'
+    if base.endswith('.rlog'):
+        return COMPRESSED_RLOG_CATEGORIES.get(ext, 'other')
+    return 'other'
 
-def report_device_sizes_after_compression(base_dir):
-    """Report the total size of each device folder after compression, with detailed dongle ID breakdown."""
+def collect_device_stats(base_dir, snapshot=None):
+    """Gather sizes and file statistics for every device and dongle ID folder.
+    
+    Works from a snapshot_tree() snapshot, walking base_dir once if none is
+    given. Returns a list of (device_name, device_size, dongles), where
+    dongles maps each dongle ID folder to {'size', 'counts', 'sizes'};
+    counts and sizes are keyed by rlog_category(). Manifests (MANIFEST_NAME)
+    are left out.
+    """
+    from collections import Counter, defaultdict
+    
+    if snapshot is None:
+        snapshot = {}
+        for _ in snapshot_tree(base_dir, snapshot):
+            pass
+    
+    base = os.fspath(base_dir)
+    if base not in snapshot:
+        raise OSError(f"Could not read {base}")
+    
+    devices = []
+    for device_name, (_, is_dir) in snapshot[base].items():
+        if not is_dir:
+            continue
+        device_path = os.path.join(base, device_name)
+        device_size = 0
+        dongles = {}
+        
+        for name, (size, is_dir) in snapshot.get(device_path, {}).items():
+            if not is_dir:
+                device_size += size
+                continue
+            counts = Counter()
+            sizes = defaultdict(int)
+            stack = [os.path.join(device_path, name)]
+            while stack:
+                directory = stack.pop()
+                for file_name, (file_size, file_is_dir) in snapshot.get(directory, {}).items():
+                    if file_is_dir:
+                        stack.append(os.path.join(directory, file_name))
+                    elif file_name != MANIFEST_NAME:  # the downloader's own bookkeeping
+                        category = rlog_category(file_name)
+                        counts[category] += 1
+                        sizes[category] += file_size
+            dongle_size = sum(sizes.values())
+            dongles[name] = {'size': dongle_size, 'counts': counts, 'sizes': sizes}
+            device_size += dongle_size
+        
+        devices.append((device_name, device_size, dongles))
+    return devices
+
+def report_device_sizes_after_compression(base_dir, snapshot=None):
+    """Report the total size of each device folder after compression, with detailed dongle ID breakdown.
+    
+    snapshot is the tree listing compress_unzipped_rlogs already took, if any.
+    """
     print("DEVICE FOLDER SIZES AFTER COMPRESSION")
     print("="*70)
     
@@ -1160,17 +1898,9 @@ def report_device_sizes_after_compression(base_dir):
         print(f"Base directory {base_dir} does not exist.")
         return
     
-    device_folders = []
-    total_all_devices = 0
-    
     try:
-        # Get all device folders (first level subdirectories)
-        for item in os.listdir(base_dir):
-            item_path = os.path.join(base_dir, item)
-            if os.path.isdir(item_path):
-                folder_size = get_folder_size(item_path)
-                device_folders.append((item, folder_size))
-                total_all_devices += folder_size
+        # Device folders (first level subdirectories) and their dongle ID folders
+        device_folders = collect_device_stats(base_dir, snapshot)
     except Exception as e:
         print(f"Error reading device folders: {e}")
         return
@@ -1179,104 +1909,74 @@ def report_device_sizes_after_compression(base_dir):
         print("No device folders found.")
         return
     
+    total_all_devices = sum(device_size for _, device_size, _ in device_folders)
+    
     # Sort devices by size (largest first)
     device_folders.sort(key=lambda x: x[1], reverse=True)
     
     print(f"Found {len(device_folders)} device folder(s):\n")
     
+    # Overall statistics, accumulated alongside the breakdown
+    total_files = 0
+    total_compressed_files = 0
+    total_uncompressed_files = 0
+    total_uncompressed_size = 0
+    total_dongle_ids = 0
+    
     # Detailed breakdown by device and dongle ID
-    for device_name, total_device_size in device_folders:
+    for device_name, total_device_size, dongles in device_folders:
         print(f"📱 DEVICE: {device_name}")
         print(f"   Total Size: {format_size(total_device_size)}")
         
-        device_path = os.path.join(base_dir, device_name)
-        
-        try:
-            # Get all dongle ID subfolders
-            dongle_folders = []
-            for subfolder in os.listdir(device_path):
-                subfolder_path = os.path.join(device_path, subfolder)
-                if os.path.isdir(subfolder_path):
-                    subfolder_size = get_folder_size(subfolder_path)
-                    dongle_folders.append((subfolder, subfolder_size, subfolder_path))
+        if dongles:
+            # Sort dongle folders by size (largest first)
+            dongle_folders = sorted(dongles.items(), key=lambda x: x[1]['size'], reverse=True)
             
-            if dongle_folders:
-                # Sort dongle folders by size (largest first)
-                dongle_folders.sort(key=lambda x: x[1], reverse=True)
+            print(f"   Dongle IDs ({len(dongle_folders)}):")
+            for dongle_id, dongle_stats in dongle_folders:
+                print(f"     🔸 {dongle_id}")
+                print(f"        Size: {format_size(dongle_stats['size'])}")
+                
+                file_counts = dongle_stats['counts']
+                file_sizes = dongle_stats['sizes']
+                dongle_total_files = sum(file_counts.values())
+                dongle_compressed = file_counts['rlog.zst'] + file_counts['rlog.gz'] + file_counts['rlog.bz2']
                 
-                print(f"   Dongle IDs ({len(dongle_folders)}):")
-                for dongle_id, dongle_size, dongle_path in dongle_folders:
-                    print(f"     🔸 {dongle_id}")
-                    print(f"        Size: {format_size(dongle_size)}")
+                total_dongle_ids += 1
+                total_files += dongle_total_files
+                total_compressed_files += dongle_compressed
+                total_uncompressed_files += file_counts['rlog']
+                total_uncompressed_size += file_sizes['rlog']
+                
+                if dongle_total_files > 0:
+                    print(f"        Files: {dongle_total_files:,} total")
                     
-                    # Get file statistics for this dongle ID
-                    file_counts = {'rlog': 0, 'rlog.gz': 0, 'rlog.zst': 0, 'rlog.bz2': 0, 'other': 0}
-                    file_sizes = {'rlog': 0, 'rlog.gz': 0, 'rlog.zst': 0, 'rlog.bz2': 0, 'other': 0}
+                    # Show detailed compression breakdown
+                    compression_details = []
+                    if file_counts['rlog.zst'] > 0:
+                        compression_details.append(f"🟢 {file_counts['rlog.zst']:,} zstd ({format_size(file_sizes['rlog.zst'])})")
+                    if file_counts['rlog.gz'] > 0:
+                        compression_details.append(f"🔵 {file_counts['rlog.gz']:,} gzip ({format_size(file_sizes['rlog.gz'])})")
+                    if file_counts['rlog.bz2'] > 0:
+                        compression_details.append(f"🟡 {file_counts['rlog.bz2']:,} bzip2 ({format_size(file_sizes['rlog.bz2'])})")
+                    if file_counts['rlog'] > 0:
+                        compression_details.append(f"🔴 {file_counts['rlog']:,} uncompressed ({format_size(file_sizes['rlog'])})")
+                    if file_counts['other'] > 0:
+                        compression_details.append(f"⚪ {file_counts['other']:,} other ({format_size(file_sizes['other'])})")
                     
-                    try:
-                        for root, dirs, files in os.walk(dongle_path):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                try:
-                                    file_size = os.path.getsize(file_path)
-                                except:
-                                    file_size = 0
-                                
-                                if file.endswith('.rlog.zst'):
-                                    file_counts['rlog.zst'] += 1
-                                    file_sizes['rlog.zst'] += file_size
-                                elif file.endswith('.rlog.gz'):
-                                    file_counts['rlog.gz'] += 1
-                                    file_sizes['rlog.gz'] += file_size
-                                elif file.endswith('.rlog.bz2'):
-                                    file_counts['rlog.bz2'] += 1
-                                    file_sizes['rlog.bz2'] += file_size
-                                elif file.endswith('.rlog'):
-                                    file_counts['rlog'] += 1
-                                    file_sizes['rlog'] += file_size
-                                else:
-                                    file_counts['other'] += 1
-                                    file_sizes['other'] += file_size
-                        
-                        total_files = sum(file_counts.values())
-                        if total_files > 0:
-                            print(f"        Files: {total_files:,} total")
-                            
-                            # Show detailed compression breakdown
-                            compression_details = []
-                            if file_counts['rlog.zst'] > 0:
-                                compression_details.append(f"🟢 {file_counts['rlog.zst']:,} zstd ({format_size(file_sizes['rlog.zst'])})")
-                            if file_counts['rlog.gz'] > 0:
-                                compression_details.append(f"🔵 {file_counts['rlog.gz']:,} gzip ({format_size(file_sizes['rlog.gz'])})")
-                            if file_counts['rlog.bz2'] > 0:
-                                compression_details.append(f"🟡 {file_counts['rlog.bz2']:,} bzip2 ({format_size(file_sizes['rlog.bz2'])})")
-                            if file_counts['rlog'] > 0:
-                                compression_details.append(f"🔴 {file_counts['rlog']:,} uncompressed ({format_size(file_sizes['rlog'])})")
-                            if file_counts['other'] > 0:
-                                compression_details.append(f"⚪ {file_counts['other']:,} other ({format_size(file_sizes['other'])})")
-                            
-                            if compression_details:
-                                for detail in compression_details:
-                                    print(f"          • {detail}")
-                            
-                            # Show compression efficiency for this dongle
-                            total_compressed = file_counts['rlog.zst'] + file_counts['rlog.gz'] + file_counts['rlog.bz2']
-                            if total_files > 0:
-                                compression_percentage = (total_compressed / total_files) * 100
-                                print(f"        Compression: {compression_percentage:.1f}% of files compressed")
-                                
-                                if file_counts['rlog'] > 0:
-                                    print(f"        ⚠️  {file_counts['rlog']:,} files still uncompressed")
-                        else:
-                            print(f"        Files: No rlog files found")
-                            
-                    except Exception as e:
-                        print(f"        Error analyzing files: {e}")
-            else:
-                print(f"   No dongle ID folders found")
-                
-        except Exception as e:
-            print(f"   Error reading dongle folders: {e}")
+                    for detail in compression_details:
+                        print(f"          • {detail}")
+                    
+                    # Show compression efficiency for this dongle
+                    compression_percentage = (dongle_compressed / dongle_total_files) * 100
+                    print(f"        Compression: {compression_percentage:.1f}% of files compressed")
+                    
+                    if file_counts['rlog'] > 0:
+                        print(f"        ⚠️  {file_counts['rlog']:,} files still uncompressed")
+                else:
+                    print(f"        Files: No rlog files found")
+        else:
+            print(f"   No dongle ID folders found")
         
         print()  # Empty line between devices
     
@@ -1286,59 +1986,6 @@ def report_device_sizes_after_compression(base_dir):
     print("-"*30)
     print(f"Total Devices: {len(device_folders)}")
     print(f"Total Size: {format_size(total_all_devices)}")
-    
-    # Calculate overall statistics
-    total_files = 0
-    total_compressed_files = 0
-    total_uncompressed_files = 0
-    total_uncompressed_size = 0
-    total_dongle_ids = 0
-    
-    for device_name, _ in device_folders:
-        device_path = os.path.join(base_dir, device_name)
-        try:
-            for subfolder in os.listdir(device_path):
-                subfolder_path = os.path.join(device_path, subfolder)
-                if os.path.isdir(subfolder_path):
-                    total_dongle_ids += 1
-                    
-                    file_counts = {'rlog': 0, 'rlog.gz': 0, 'rlog.zst': 0, 'rlog.bz2': 0, 'other': 0}
-                    file_sizes = {'rlog': 0, 'rlog.gz': 0, 'rlog.zst': 0, 'rlog.bz2': 0, 'other': 0}
-                    
-                    for root, dirs, files in os.walk(subfolder_path):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            try:
-                                file_size = os.path.getsize(file_path)
-                            except:
-                                file_size = 0
-                            
-                            if file.endswith('.rlog.zst'):
-                                file_counts['rlog.zst'] += 1
-                                file_sizes['rlog.zst'] += file_size
-                            elif file.endswith('.rlog.gz'):
-                                file_counts['rlog.gz'] += 1
-                                file_sizes['rlog.gz'] += file_size
-                            elif file.endswith('.rlog.bz2'):
-                                file_counts['rlog.bz2'] += 1
-                                file_sizes['rlog.bz2'] += file_size
-                            elif file.endswith('.rlog'):
-                                file_counts['rlog'] += 1
-                                file_sizes['rlog'] += file_size
-                            else:
-                                file_counts['other'] += 1
-                                file_sizes['other'] += file_size
-                    
-                    dongle_total_files = sum(file_counts.values())
-                    dongle_compressed = file_counts['rlog.zst'] + file_counts['rlog.gz'] + file_counts['rlog.bz2']
-                    
-                    total_files += dongle_total_files
-                    total_compressed_files += dongle_compressed
-                    total_uncompressed_files += file_counts['rlog']
-                    total_uncompressed_size += file_sizes['rlog']
-        except:
-            pass
-    
     print(f"Total Dongle IDs: {total_dongle_ids}")
     print(f"Total Files: {total_files:,}")
     
@@ -1365,13 +2012,15 @@ def main():
     
     if transfer_method.lower() == "rsync":
         print(f"Rsync optimizations enabled:")
-        print(f"  - Compression level: {rsync_compress_level}")
-        print(f"  - Whole file transfers: {rsync_whole_file}")
+        print(f"  - Compression level: {rsync_compress_level} (uncompressed rlogs only)")
+        print(f"  - Resumable in-place transfers: {rsync_resume_partial}")
         print(f"  - Bandwidth limit: {rsync_bandwidth_limit} KB/s" if rsync_bandwidth_limit > 0 else "  - Bandwidth limit: None")
         print(f"  - SSH connection multiplexing: Enabled")
         print(f"  - Bulk transfer with smart filtering: Enabled")
         
-        if not is_rsync_available():
+        if is_rsync_available():
+            print(f"Found rsync: {rsync_version()}")
+        else:
             print("Warning: rsync not found, will fall back to SFTP if needed")
             if platform.system() == "Windows":
                 print("Tip: Install Git for Windows or WSL to enable rsync support")
@@ -1386,11 +2035,31 @@ def main():
     print(f"\nStarting download for {len(device_list)} device(s)...")
     for device in device_list:
         print(f"Processing {device['hostname']} (subfolder: {device['label']}) with user {device['username']}")
-        fetch_rlogs(device)
-        time.sleep(5)  # Optional wait between devices
-
-    print("Compressing unzipped rlogs and generating size report...")
-    compress_unzipped_rlogs(diroutbase)
+    
+    # Compress rlogs as soon as they land, so compression overlaps the
+    # downloads still running instead of waiting for all of them
+    method = select_compression_method()
+    executor = make_compression_executor(method)
+    submitted = []
+    
+    def compress_downloaded(full_path):
+        if executor is None or not full_path.endswith("rlog"):
+            return
+        try:
+            file_size = os.path.getsize(full_path)
+        except OSError:
+            return
+        item = (full_path, file_size, rlog_device_label(full_path, diroutbase))
+        submitted.append((item, executor.submit(compress_rlog_file, full_path, method)))
+    
+    try:
+        fetch_all(device_list, on_file=compress_downloaded)
+        
+        print("Compressing unzipped rlogs and generating size report...")
+        compress_unzipped_rlogs(diroutbase, method, executor, submitted)
+    finally:
+        if executor is not None:
+            executor.shutdown()
     print("Done.")
 
 if __name__ == "__main__":
@@ -30,25 +30,23 @@ License: MIT
 
 import os
 import sys
-import json
-import subprocess
 import platform
-import shutil
-import time
-from pathlib import Path
-from typing import Dict, List, Optional
-import importlib.util
+# Everything else (subprocess, importlib) is imported by the menu actions
+# that use it, so the menu comes up without loading them
+
+# Looked up once; the menu actions branch on it repeatedly
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+
+# Files next to this script
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_REQUIREMENTS = os.path.join(_SCRIPT_DIR, "requirements.txt")
+_DEPS_STAMP = os.path.join(_SCRIPT_DIR, ".deps.stamp")
+_VENV_DIR = os.path.join(_SCRIPT_DIR, "venv")
 
 # Color codes for cross-platform terminal colors
 class Colors:
     """ANSI color codes for terminal output"""
-    if platform.system() == "Windows":
-        # Enable ANSI color support on Windows 10+
-        try:
-            os.system('color')
-        except:
-            pass
-    
     RED = '\033[91m'
     GREEN = '\033[92m'
     YELLOW = '\033[93m'
@@ -60,10 +58,39 @@ class Colors:
     UNDERLINE = '\033[4m'
     END = '\033[0m'
 
+_ansi_ready = False  # Windows console only needs switching to ANSI mode once
+
+def _ensure_ansi():
+    """Enable ANSI color support in the Windows 10+ console.
+    
+    SetConsoleMode is an in-process call; os.system('color') did the same by
+    starting cmd.exe on every launch.
+    """
+    global _ansi_ready
+    if _ansi_ready:
+        return
+    _ansi_ready = True
+    if not _IS_WINDOWS:
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except Exception:
+        pass
+
+def colored(text: str, color: str = Colors.WHITE, bold: bool = False) -> str:
+    """Wrap text in color codes"""
+    prefix = Colors.BOLD if bold else ""
+    return f"{prefix}{color}{text}{Colors.END}"
+
 def print_colored(text: str, color: str = Colors.WHITE, bold: bool = False):
     """Print colored text to terminal"""
-    prefix = Colors.BOLD if bold else ""
-    print(f"{prefix}{color}{text}{Colors.END}")
+    _ensure_ansi()
+    print(colored(text, color, bold))
 
 def print_header(title: str):
     """Print a formatted header"""
@@ -92,24 +119,141 @@ def check_python_version():
     return True
 
 def check_module_available(module_name: str) -> bool:
-    """Check if a Python module is available"""
-    try:
-        importlib.import_module(module_name)
+    """Check if a Python module is available (found on the path, not executed)"""
+    if module_name in sys.modules:
         return True
-    except ImportError:
+    import importlib.util
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
         return False
 
+def kill_process_tree(process):
+    """Kill a process started by run_with_timeout() along with everything it started."""
+    import subprocess
+    try:
+        if _IS_WINDOWS:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            import signal
+            os.killpg(process.pid, signal.SIGKILL)  # its own session, so pgid == pid
+    except OSError:
+        pass
+    process.kill()
+
+def run_with_timeout(cmd, timeout, check=False, capture_output=False, input=None, text=False,
+                     stdout=None, stderr=None):
+    """Run a command like subprocess.run(), but time out on time.
+    
+    subprocess.run() only kills the direct child when the timeout expires;
+    installers that spawned helpers kept the output pipes open, so the call
+    went on blocking well past its timeout. Here the command gets its own
+    process group, and the whole tree is killed. Not for interactive
+    commands: they would lose the terminal's Ctrl+C.
+    """
+    import subprocess
+    kwargs = {"stdout": stdout, "stderr": stderr}
+    if capture_output:
+        kwargs.update(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    if _IS_WINDOWS:
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    
+    process = subprocess.Popen(cmd, text=text, **kwargs)
+    try:
+        stdout, stderr = process.communicate(input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(process)
+        process.communicate()
+        raise
+    
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+def pip_install_command(python_exe, *args):
+    """Build a pip install command line for the given interpreter.
+    
+    --prefer-binary takes an existing wheel over building a newer sdist.
+    Downloads are cached by pip in its per-user cache, which every venv
+    shares, so a recreated venv installs from there without fetching again.
+    """
+    return [python_exe, "-m", "pip", "install", "--prefer-binary", *args]
+
+def read_requirements(requirements_file):
+    """Return the requirement lines of a requirements file, without comments and blanks"""
+    with open(requirements_file) as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line and not line.startswith('-')]
+
+def install_requirements_one_by_one(python_exe, requirements):
+    """Install each requirement on its own; return the ones that failed.
+    
+    One package that can't build (e.g. missing C toolchain) no longer stops
+    the others from installing.
+    """
+    failed = []
+    for requirement in requirements:
+        try:
+            result = run_with_timeout(pip_install_command(python_exe, requirement), timeout=120)
+            if result.returncode == 0:
+                print_colored(f"   ✅ {requirement}", Colors.GREEN)
+                continue
+        except Exception:
+            pass
+        print_colored(f"   ❌ {requirement}", Colors.RED)
+        failed.append(requirement)
+    return failed
+
+REQUIRED_MODULES = ['paramiko']
+
+def requirements_stamp(requirements_file, python_exe=sys.executable):
+    """Identify requirements.txt's contents as installed for an interpreter"""
+    import hashlib
+    with open(requirements_file, 'rb') as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(os.fsencode(python_exe))
+    return digest.hexdigest()
+
+def read_stamp(stamp_file):
+    """Return the stamp recorded by write_stamp(), or None"""
+    try:
+        with open(stamp_file) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def write_stamp(stamp_file, stamp):
+    """Record a successful install (best effort)"""
+    try:
+        with open(stamp_file, 'w') as f:
+            f.write(stamp + "\n")
+    except OSError:
+        pass
+
 def install_python_dependencies():
     """Install Python dependencies with virtual environment support"""
+    import subprocess
     print_section("Installing Python Dependencies")
     
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    requirements_file = os.path.join(script_dir, "requirements.txt")
+    requirements_file = _REQUIREMENTS
     
     if not os.path.exists(requirements_file):
         print_colored("❌ requirements.txt not found", Colors.RED)
         return False
     
+    # Skip pip entirely if this exact requirements.txt was installed for this
+    # interpreter before and the required modules are still there
+    stamp_file = _DEPS_STAMP
+    stamp = requirements_stamp(requirements_file)
+    if read_stamp(stamp_file) == stamp and all(check_module_available(module) for module in REQUIRED_MODULES):
+        print_colored("✅ Dependencies already up to date", Colors.GREEN)
+        return True
+    
     # Check if we're already in a virtual environment
     in_venv = hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
     
@@ -120,44 +264,63 @@ def install_python_dependencies():
     
     # Try direct pip install first
     try:
-        result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_file], 
-                              capture_output=True, text=True, timeout=300)
+        result = run_with_timeout(pip_install_command(sys.executable, "-r", requirements_file), timeout=300)
         if result.returncode == 0:
             print_colored("✅ Dependencies installed successfully!", Colors.GREEN)
+            write_stamp(stamp_file, stamp)
             return True
-        else:
-            print_colored("⚠️  Direct install failed, trying virtual environment...", Colors.YELLOW)
+        
+        print_colored("⚠️  Bulk install failed, installing packages one at a time...", Colors.YELLOW)
+        requirements = read_requirements(requirements_file)
+        failed = install_requirements_one_by_one(sys.executable, requirements)
+        if not failed:
+            print_colored("✅ Dependencies installed successfully!", Colors.GREEN)
+            write_stamp(stamp_file, stamp)
+            return True
+        if len(failed) < len(requirements):
+            print_colored(f"⚠️  Could not install: {', '.join(failed)}", Colors.YELLOW)
+            return True
+        print_colored("⚠️  Direct install failed, trying virtual environment...", Colors.YELLOW)
     except Exception as e:
         print_colored(f"⚠️  Install error: {e}", Colors.YELLOW)
     
     # Try with virtual environment
-    venv_dir = os.path.join(script_dir, "venv")
+    venv_dir = _VENV_DIR
     
     if not os.path.exists(venv_dir):
         print_colored("🔧 Creating virtual environment...", Colors.YELLOW)
         try:
-            subprocess.run([sys.executable, "-m", "venv", venv_dir], check=True, timeout=60)
+            run_with_timeout([sys.executable, "-m", "venv", venv_dir], check=True, timeout=60)
         except Exception as e:
             print_colored(f"❌ Failed to create virtual environment: {e}", Colors.RED)
             return False
     
     # Determine activation script path
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         activate_script = os.path.join(venv_dir, "Scripts", "activate.bat")
         python_exe = os.path.join(venv_dir, "Scripts", "python.exe")
     else:
         activate_script = os.path.join(venv_dir, "bin", "activate")
         python_exe = os.path.join(venv_dir, "bin", "python")
     
-    # Install dependencies in virtual environment
+    # Install dependencies in virtual environment, unless it already got this
+    # requirements.txt on an earlier run and its packages are still consistent
+    venv_stamp_file = os.path.join(venv_dir, ".deps.stamp")
+    venv_stamp = requirements_stamp(requirements_file, python_exe)
     try:
-        subprocess.run([python_exe, "-m", "pip", "install", "-r", requirements_file], 
-                      check=True, timeout=300)
-        print_colored("✅ Dependencies installed in virtual environment!", Colors.GREEN)
+        if (read_stamp(venv_stamp_file) == venv_stamp and
+                run_with_timeout([python_exe, "-m", "pip", "check"], timeout=30,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0):
+            print_colored("✅ Virtual environment already has the dependencies", Colors.GREEN)
+        else:
+            run_with_timeout(pip_install_command(python_exe, "-r", requirements_file),
+                          check=True, timeout=300)
+            write_stamp(venv_stamp_file, venv_stamp)
+            print_colored("✅ Dependencies installed in virtual environment!", Colors.GREEN)
         
         # Create wrapper info
         print_colored("💡 Virtual environment created. You can run scripts with:", Colors.CYAN)
-        if platform.system() == "Windows":
+        if _IS_WINDOWS:
             print_colored(f"   venv\\Scripts\\python.exe comma_rlog_manager.py", Colors.CYAN)
         else:
             print_colored(f"   source venv/bin/activate && python comma_rlog_manager.py", Colors.CYAN)
@@ -167,28 +330,69 @@ def install_python_dependencies():
         print_colored(f"❌ Failed to install dependencies in virtual environment: {e}", Colors.RED)
         return False
 
+# Set once rclone and the gdrive remote have been found; only the ready
+# state is kept, so a missing rclone is looked for again on the next check
+_rclone_ready = False
+
+def clear_rclone_cache():
+    """Make the next check_rclone() ask rclone again"""
+    global _rclone_ready
+    _rclone_ready = False
+
+def rclone_config_has_remote(name):
+    """Whether rclone's config file defines the remote [name], read without running rclone.
+    
+    Looks where rclone does by default (or at $RCLONE_CONFIG). False means
+    "not found here", not "not configured": the config may be encrypted or
+    live elsewhere, so callers fall back to rclone listremotes.
+    """
+    if os.environ.get("RCLONE_CONFIG"):
+        candidates = [os.environ["RCLONE_CONFIG"]]
+    else:
+        candidates = []
+        if _IS_WINDOWS and os.environ.get("APPDATA"):
+            candidates.append(os.path.join(os.environ["APPDATA"], "rclone", "rclone.conf"))
+        config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        candidates.append(os.path.join(config_home, "rclone", "rclone.conf"))
+        candidates.append(os.path.expanduser("~/.rclone.conf"))
+    
+    header = f"[{name}]"
+    for path in candidates:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                # rclone uses the first config file that exists
+                return any(line.strip() == header for line in f)
+        except OSError:
+            continue
+    return False
+
 def check_rclone():
     """Check if rclone is installed and configured"""
+    global _rclone_ready
     print_section("Checking RClone Configuration")
     
-    # Check if rclone is installed
-    try:
-        result = subprocess.run(["rclone", "version"], capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0] if result.stdout else "Unknown version"
-            print_colored(f"✅ RClone found: {version_line}", Colors.GREEN)
-        else:
-            print_colored("❌ RClone not found", Colors.RED)
-            return False, False
-    except Exception:
+    if _rclone_ready:
+        print_colored("✅ RClone and Google Drive remote 'gdrive' found earlier this session", Colors.GREEN)
+        return True, True
+    
+    # Check if rclone is installed (a PATH lookup instead of running rclone version)
+    import shutil
+    rclone_path = shutil.which("rclone")
+    if rclone_path is None:
         print_colored("❌ RClone not found or not in PATH", Colors.RED)
         return False, False
+    print_colored(f"✅ RClone found: {rclone_path}", Colors.GREEN)
     
-    # Check if Google Drive remote is configured
+    # Check if Google Drive remote is configured, from the config file if possible
+    if rclone_config_has_remote("gdrive"):
+        print_colored("✅ Google Drive remote 'gdrive' is configured", Colors.GREEN)
+        _rclone_ready = True
+        return True, True
     try:
-        result = subprocess.run(["rclone", "listremotes"], capture_output=True, text=True, timeout=10)
+        result = run_with_timeout(["rclone", "listremotes"], capture_output=True, text=True, timeout=10)
         if "gdrive:" in result.stdout:
             print_colored("✅ Google Drive remote 'gdrive' is configured", Colors.GREEN)
+            _rclone_ready = True
             return True, True
         else:
             print_colored("⚠️  Google Drive remote 'gdrive' not configured", Colors.YELLOW)
@@ -199,22 +403,19 @@ def check_rclone():
 
 def install_rclone():
     """Install rclone based on the operating system"""
+    import subprocess
     print_section("Installing RClone")
     
-    system = platform.system()
-    
-    if system == "Windows":
+    if _IS_WINDOWS:
         print_colored("🔧 Attempting to install rclone via winget...", Colors.YELLOW)
         try:
-            result = subprocess.run(["winget", "install", "Rclone.Rclone"], 
-                                  capture_output=True, text=True, timeout=120)
+            result = run_with_timeout(["winget", "install", "Rclone.Rclone"], timeout=120)
             if result.returncode == 0:
                 print_colored("✅ RClone installed successfully via winget!", Colors.GREEN)
                 return True
             else:
                 print_colored("⚠️  winget install failed, trying chocolatey...", Colors.YELLOW)
-                result = subprocess.run(["choco", "install", "rclone", "-y"], 
-                                      capture_output=True, text=True, timeout=120)
+                result = run_with_timeout(["choco", "install", "rclone", "-y"], timeout=120)
                 if result.returncode == 0:
                     print_colored("✅ RClone installed successfully via chocolatey!", Colors.GREEN)
                     return True
@@ -226,11 +427,10 @@ def install_rclone():
         print_colored("   2. Or use chocolatey: choco install rclone", Colors.CYAN)
         print_colored("   3. Add rclone to your PATH", Colors.CYAN)
         
-    elif system == "Darwin":  # macOS
+    elif _SYSTEM == "Darwin":  # macOS
         print_colored("🔧 Attempting to install rclone via Homebrew...", Colors.YELLOW)
         try:
-            result = subprocess.run(["brew", "install", "rclone"], 
-                                  capture_output=True, text=True, timeout=120)
+            result = run_with_timeout(["brew", "install", "rclone"], timeout=120)
             if result.returncode == 0:
                 print_colored("✅ RClone installed successfully via Homebrew!", Colors.GREEN)
                 return True
@@ -252,10 +452,17 @@ def install_rclone():
                 (["pacman", "-Sy"], ["pacman", "-S", "--noconfirm", "rclone"])
             ]
             
+            # Only try the managers that are installed (a PATH lookup, no process),
+            # and only refresh the package index if the first install attempt fails
+            import shutil
             for update_cmd, install_cmd in distro_commands:
+                if shutil.which(install_cmd[0]) is None:
+                    continue
                 try:
-                    subprocess.run(update_cmd, capture_output=True, timeout=30)
-                    result = subprocess.run(install_cmd, capture_output=True, text=True, timeout=120)
+                    result = run_with_timeout(install_cmd, timeout=120)
+                    if result.returncode != 0:
+                        run_with_timeout(update_cmd, timeout=30)
+                        result = run_with_timeout(install_cmd, timeout=120)
                     if result.returncode == 0:
                         print_colored("✅ RClone installed successfully via package manager!", Colors.GREEN)
                         return True
@@ -263,7 +470,7 @@ def install_rclone():
                     continue
             
             # Fall back to rclone install script
-            result = subprocess.run(["curl", "https://rclone.org/install.sh"], 
+            result = run_with_timeout(["curl", "https://rclone.org/install.sh"], 
                                   capture_output=True, text=True, timeout=30)
             if result.returncode == 0:
                 install_process = subprocess.run(["sudo", "bash"], input=result.stdout, 
@@ -282,6 +489,7 @@ def install_rclone():
 
 def configure_rclone():
     """Guide user through rclone Google Drive configuration"""
+    import subprocess
     print_section("Configuring RClone for Google Drive")
     
     print_colored("🔧 Starting rclone configuration...", Colors.YELLOW)
@@ -293,11 +501,13 @@ def configure_rclone():
     print_colored("4. Follow the authentication prompts", Colors.WHITE)
     print()
     
+    # rclone config can delete or rename remotes too
+    clear_rclone_cache()
     try:
         subprocess.run(["rclone", "config"], timeout=300)
         
         # Verify configuration
-        result = subprocess.run(["rclone", "listremotes"], capture_output=True, text=True, timeout=10)
+        result = run_with_timeout(["rclone", "listremotes"], capture_output=True, text=True, timeout=10)
         if "gdrive:" in result.stdout:
             print_colored("✅ Google Drive remote configured successfully!", Colors.GREEN)
             return True
@@ -308,23 +518,37 @@ def configure_rclone():
         print_colored(f"❌ Configuration failed: {e}", Colors.RED)
         return False
 
+_module_cache = {}  # script name -> module loaded by import_script_module()
+
+def clear_module_cache():
+    """Make the next import_script_module() load its script from disk again"""
+    _module_cache.clear()
+
 def import_script_module(script_name: str):
-    """Dynamically import a script module"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    script_path = os.path.join(script_dir, script_name)
+    """Dynamically import a script module (once per session)"""
+    if script_name in _module_cache:
+        return _module_cache[script_name]
+    
+    import importlib.util
+    script_path = os.path.join(_SCRIPT_DIR, script_name)
     
     if not os.path.exists(script_path):
         return None
     
-    spec = importlib.util.spec_from_file_location(script_name.replace('.py', ''), script_path)
+    module_name = script_name.replace('.py', '')
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
     if spec is None:
         return None
     
     module = importlib.util.module_from_spec(spec)
+    # Register before executing so worker processes can pickle its functions
+    sys.modules[module_name] = module
     try:
         spec.loader.exec_module(module)
+        _module_cache[script_name] = module
         return module
     except Exception as e:
+        sys.modules.pop(module_name, None)
         print_colored(f"❌ Error importing {script_name}: {e}", Colors.RED)
         return None
 
@@ -342,10 +566,9 @@ def run_setup():
         return False
     
     # Check for required modules
-    required_modules = ['paramiko']
     missing_modules = []
     
-    for module in required_modules:
+    for module in REQUIRED_MODULES:
         if not check_module_available(module):
             missing_modules.append(module)
     
@@ -410,11 +633,10 @@ def run_download():
         
         print_colored(f"🚀 Starting download for {len(devices)} device(s)...", Colors.CYAN)
         
-        # Run download for each device
+        # Download from all devices at once; each worker has its own connection
         for device in devices:
             print_colored(f"📱 Processing {device['hostname']} (subfolder: {device['label']})", Colors.BLUE)
-            download_module.fetch_rlogs(device)
-            time.sleep(2)  # Brief pause between devices
+        download_module.fetch_all(devices)
         
         # Run compression and size reporting
         print_colored("🗜️  Compressing and generating size report...", Colors.CYAN)
@@ -489,14 +711,35 @@ def run_size_report():
     except Exception as e:
         print_colored(f"❌ Size report error: {e}", Colors.RED)
 
+def warm_up_upload():
+    """Get the upload step ready in the background: load upload.py and let
+    rclone refresh the gdrive access token (saved to its config for the
+    upload's rclone calls). Prints nothing unless upload.py fails to load.
+    """
+    import shutil
+    import subprocess
+    import_script_module("upload.py")
+    if shutil.which("rclone") is None:
+        return
+    try:
+        run_with_timeout(["rclone", "about", "gdrive:"], timeout=60,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception:
+        pass  # the upload step reports rclone problems itself
+
 def run_complete_workflow():
     """Run the complete workflow: download -> compress -> upload"""
+    import threading
     print_header("🔄 COMPLETE WORKFLOW")
     
     print_colored("🚀 Starting complete rlog management workflow...", Colors.CYAN, bold=True)
     print_colored("This will: Download rlogs → Compress → Generate report → Upload to Google Drive", Colors.WHITE)
     print()
     
+    # Prepare the upload while the download runs
+    upload_warm_up = threading.Thread(target=warm_up_upload, daemon=True)
+    upload_warm_up.start()
+    
     # Step 1: Download
     print_colored("📥 Step 1: Downloading route logs...", Colors.BLUE, bold=True)
     if not run_download():
@@ -505,6 +748,7 @@ def run_complete_workflow():
     
     # Step 2: Upload (compression already done in download step)
     print_colored("☁️  Step 2: Uploading to Google Drive...", Colors.BLUE, bold=True)
+    upload_warm_up.join()
     if not run_upload():
         print_colored("⚠️  Upload failed, but download was successful", Colors.YELLOW)
         print_colored("You can try uploading manually later", Colors.YELLOW)
@@ -515,6 +759,7 @@ def run_complete_workflow():
 
 def run_git_update():
     """Update the downloader using git pull"""
+    import subprocess
     print_header("🔄 GIT UPDATE")
     
     print_colored("🔄 Updating Comma Rlog Downloader...", Colors.CYAN, bold=True)
@@ -553,6 +798,8 @@ def run_git_update():
             print(pull_result.stderr)
         
         if pull_result.returncode == 0:
+            # Load the pulled download/upload scripts instead of the ones already imported
+            clear_module_cache()
             print_colored("✅ Update completed successfully!", Colors.GREEN, bold=True)
             print_colored("💡 If new dependencies were added, you may need to run pip install -r requirements.txt", Colors.CYAN)
             return True
@@ -572,57 +819,67 @@ def run_git_update():
         print_colored(f"❌ Unexpected error during update: {e}", Colors.RED)
         return False
 
+# The main menu is shown after every action, so it's formatted once
+MAIN_MENU_TEXT = "\n".join([
+    "",
+    colored("📋 MAIN MENU", Colors.CYAN, bold=True),
+    colored("-" * 30, Colors.CYAN),
+    *(colored(item, Colors.WHITE) for item in (
+        "1. 🛠️ Setup & Configuration",
+        "2. 📱 Device Management",
+        "3. 📥 Download from Comma 3/3X",
+        "4. ☁️ Upload to Google Drive",
+        "5. 📊 Device Size Report",
+        "6. 🔄 Complete Workflow (Download + Upload)",
+        "7. ❓ Help & Information",
+        "8. 🔄 Update Downloader",
+        "9. 🚪 Exit",
+    )),
+    "",
+])
+
 def show_main_menu():
     """Display the main menu"""
-    print()
-    print_colored("📋 MAIN MENU", Colors.CYAN, bold=True)
-    print_colored("-" * 30, Colors.CYAN)
-    print_colored("1. 🛠️ Setup & Configuration", Colors.WHITE)
-    print_colored("2. 📱 Device Management", Colors.WHITE)
-    print_colored("3. 📥 Download from Comma 3/3X", Colors.WHITE)
-    print_colored("4. ☁️ Upload to Google Drive", Colors.WHITE)
-    print_colored("5. 📊 Device Size Report", Colors.WHITE)
-    print_colored("6. 🔄 Complete Workflow (Download + Upload)", Colors.WHITE)
-    print_colored("7. ❓ Help & Information", Colors.WHITE)
-    print_colored("8. 🔄 Update Downloader", Colors.WHITE)
-    print_colored("9. 🚪 Exit", Colors.WHITE)
-    print()
+    _ensure_ansi()
+    print(MAIN_MENU_TEXT)
 
 def show_help():
     """Show help information"""
     print_header("❓ HELP & INFORMATION")
     
-    print_colored("🎯 WHAT THIS SCRIPT DOES:", Colors.BLUE, bold=True)
-    print_colored("This unified launcher combines all Comma 3/3X rlog management functions:", Colors.WHITE)
-    print()
-    print_colored("• Setup & Configuration: Install dependencies and configure rclone", Colors.GREEN)
-    print_colored("• Device Management: Add/edit/remove devices, view size reports", Colors.GREEN) 
-    print_colored("• Download from Comma 3/3X: Download rlogs from your Comma device(s)", Colors.GREEN)
-    print_colored("• Upload to Google Drive: Backup rlogs to cloud storage", Colors.GREEN)
-    print_colored("• Size Reports: View storage usage and compression statistics", Colors.GREEN)
-    print_colored("• Complete Workflow: Automated download → compress → upload process", Colors.GREEN)
-    print()
-    
-    print_colored("🔧 SETUP REQUIREMENTS:", Colors.BLUE, bold=True)
-    print_colored("• Python 3.6+ (for running the scripts)", Colors.WHITE)
-    print_colored("• SSH access to your Comma device", Colors.WHITE)
-    print_colored("• RClone (for Google Drive uploads)", Colors.WHITE)
-    print_colored("• Google Drive account (for backups)", Colors.WHITE)
-    print()
-    
-    print_colored("📚 USAGE TIPS:", Colors.BLUE, bold=True)
-    print_colored("• Run 'Setup & Configuration' first on new installations", Colors.WHITE)
-    print_colored("• Use 'Device Management' to add your Comma device(s)", Colors.WHITE)
-    print_colored("• 'Complete Workflow' automates the entire process", Colors.WHITE)
-    print_colored("• Size reports help track storage usage and compression efficiency", Colors.WHITE)
-    print()
-    
-    print_colored("🐛 TROUBLESHOOTING:", Colors.BLUE, bold=True)
-    print_colored("• If setup fails, try running as administrator/sudo", Colors.WHITE)
-    print_colored("• For SSH issues, verify your key is copied to the device", Colors.WHITE)
-    print_colored("• For upload issues, check rclone configuration: rclone config", Colors.WHITE)
-    print_colored("• Check README.md for detailed troubleshooting guide", Colors.WHITE)
-    print()
+    # Collected and written at once rather than one print per line
+    lines = [
+        colored("🎯 WHAT THIS SCRIPT DOES:", Colors.BLUE, bold=True),
+        colored("This unified launcher combines all Comma 3/3X rlog management functions:", Colors.WHITE),
+        "",
+        colored("• Setup & Configuration: Install dependencies and configure rclone", Colors.GREEN),
+        colored("• Device Management: Add/edit/remove devices, view size reports", Colors.GREEN),
+        colored("• Download from Comma 3/3X: Download rlogs from your Comma device(s)", Colors.GREEN),
+        colored("• Upload to Google Drive: Backup rlogs to cloud storage", Colors.GREEN),
+        colored("• Size Reports: View storage usage and compression statistics", Colors.GREEN),
+        colored("• Complete Workflow: Automated download → compress → upload process", Colors.GREEN),
+        "",
+        colored("🔧 SETUP REQUIREMENTS:", Colors.BLUE, bold=True),
+        colored("• Python 3.6+ (for running the scripts)", Colors.WHITE),
+        colored("• SSH access to your Comma device", Colors.WHITE),
+        colored("• RClone (for Google Drive uploads)", Colors.WHITE),
+        colored("• Google Drive account (for backups)", Colors.WHITE),
+        "",
+        colored("📚 USAGE TIPS:", Colors.BLUE, bold=True),
+        colored("• Run 'Setup & Configuration' first on new installations", Colors.WHITE),
+        colored("• Use 'Device Management' to add your Comma device(s)", Colors.WHITE),
+        colored("• 'Complete Workflow' automates the entire process", Colors.WHITE),
+        colored("• Size reports help track storage usage and compression efficiency", Colors.WHITE),
+        "",
+        colored("🐛 TROUBLESHOOTING:", Colors.BLUE, bold=True),
+        colored("• If setup fails, try running as administrator/sudo", Colors.WHITE),
+        colored("• For SSH issues, verify your key is copied to the device", Colors.WHITE),
+        colored("• For upload issues, check rclone configuration: rclone config", Colors.WHITE),
+        colored("• Check README.md for detailed troubleshooting guide", Colors.WHITE),
+        "",
+    ]
+    _ensure_ansi()
+    print("\n".join(lines))
 
 def main():
     """Main application loop"""
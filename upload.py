@@ -36,80 +36,108 @@ import os
 import sys
 import json
 import subprocess
-import shutil
+import tempfile
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configuration
 REMOTE_NAME = "gdrive"  # Name of your rclone remote (change if different)
 GOOGLE_DRIVE_FOLDER = "rlogs"  # Main folder name in Google Drive
 MAX_FOLDER_SIZE_GB = 1.9  # Maximum size per device folder in GB
 MAX_FOLDER_SIZE_BYTES = int(MAX_FOLDER_SIZE_GB * 1024 * 1024 * 1024)
+# Remote folders uploaded at once when they can't share one rclone copy (each is its
+# own rclone process); kept low to stay within Google Drive's per-user request quota
+MAX_PARALLEL_DONGLES = max(1, int(os.environ.get("RCLONE_PARALLEL_UPLOADS", "3")))
+# Files each rclone process transfers (and checks) at once; rlogs are small, so
+# Drive is limited by per-file latency rather than bandwidth
+RCLONE_TRANSFERS = os.environ.get("RCLONE_TRANSFERS", "32")
 
 # Get directories
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 RLOGS_DIR = os.path.join(SCRIPT_DIR, "rlogs")
 
+# Extensions of the files that are uploaded
+RLOG_EXTENSIONS = ('.rlog', '.bz2', '.gz', '.zst')
+
+class UploadStats:
+    """File counts of an upload; add them up with +=."""
+    __slots__ = ('uploaded', 'skipped', 'failed')
+    
+    def __init__(self, uploaded: int = 0, skipped: int = 0, failed: int = 0):
+        self.uploaded = uploaded
+        self.skipped = skipped
+        self.failed = failed
+    
+    def __iadd__(self, other: 'UploadStats') -> 'UploadStats':
+        self.uploaded += other.uploaded
+        self.skipped += other.skipped
+        self.failed += other.failed
+        return self
+
+def iter_rlog_files(root: Path) -> Iterator[Tuple[Path, int]]:
+    """Yield (path, size) for every rlog file under root.
+    
+    os.scandir supplies the file type with each entry, so only the size
+    needs a stat, and each file is stat'ed once. Hidden directories hold
+    in-progress rsync transfers (partial files under their final names),
+    so they are skipped.
+    """
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    # Rlog names are lowercase, so lowercasing is rarely needed
+                    name = entry.name
+                    if name.endswith(RLOG_EXTENSIONS) or name.lower().endswith(RLOG_EXTENSIONS):
+                        yield Path(entry.path), entry.stat().st_size
+
 class RCloneUploader:
     def __init__(self):
         self.remote_path = f"{REMOTE_NAME}:{GOOGLE_DRIVE_FOLDER}"
+        self._rclone_probe = None  # (installed, remotes), see probe_rclone
+        self.show_progress = True  # rclone's live progress display; off when uploads run in parallel
+        
+    def probe_rclone(self) -> Tuple[bool, set]:
+        """Find out whether rclone runs and which remotes it has, in one call.
         
+        rclone config dump both proves the binary works and lists the
+        configured remotes (its JSON keys); the result is kept for the
+        checks that follow.
+        """
+        if self._rclone_probe is None:
+            try:
+                result = subprocess.run(["rclone", "config", "dump"],
+                                        capture_output=True, text=True, timeout=10)
+                try:
+                    remotes = set(json.loads(result.stdout)) if result.returncode == 0 else set()
+                except json.JSONDecodeError:
+                    remotes = set()
+                self._rclone_probe = (True, remotes)
+            except (subprocess.TimeoutExpired, FileNotFoundError):
+                self._rclone_probe = (False, set())
+        return self._rclone_probe
+    
     def check_rclone_installed(self) -> bool:
         """Check if rclone is installed and accessible."""
-        try:
-            result = subprocess.run(["rclone", "version"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                version_line = result.stdout.split('\n')[0]
-                print(f"Found rclone: {version_line}")
-                return True
-            else:
-                return False
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        installed, _ = self.probe_rclone()
+        if installed:
+            print("Found rclone")
+        return installed
     
     def check_remote_configured(self) -> bool:
         """Check if the Google Drive remote is configured."""
-        try:
-            result = subprocess.run(["rclone", "listremotes"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                remotes = result.stdout.strip().split('\n')
-                remote_with_colon = f"{REMOTE_NAME}:"
-                if remote_with_colon in remotes:
-                    print(f"Found configured remote: {REMOTE_NAME}")
-                    return True
-                else:
-                    print(f"Available remotes: {', '.join(remotes)}")
-                    return False
-            return False
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
-    
-    def get_remote_folder_size(self, remote_folder: str) -> int:
-        """Get the size of a remote folder in bytes."""
-        try:
-            result = subprocess.run([
-                "rclone", "size", f"{self.remote_path}/{remote_folder}", "--json"
-            ], capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0:
-                size_info = json.loads(result.stdout)
-                return size_info.get('bytes', 0)
-            else:
-                # Folder might not exist yet
-                return 0
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
-            return 0
-    
-    def get_local_folder_size(self, folder_path: Path) -> int:
-        """Get the size of a local folder in bytes."""
-        total_size = 0
-        for file_path in folder_path.rglob('*'):
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
-        return total_size
+        _, remotes = self.probe_rclone()
+        if REMOTE_NAME in remotes:
+            print(f"Found configured remote: {REMOTE_NAME}")
+            return True
+        print(f"Available remotes: {', '.join(sorted(f'{remote}:' for remote in remotes))}")
+        return False
     
     def list_remote_files(self, remote_folder: str) -> set:
         """List all files in a remote folder."""
@@ -126,83 +154,110 @@ class RCloneUploader:
         except (subprocess.TimeoutExpired, FileNotFoundError):
             return set()
     
-    def find_best_subfolder(self, device_name: str, dongle_id: str, file_size: int) -> str:
-        """Find the best subfolder for a file, considering size limits."""
-        base_folder = f"{device_name}/{dongle_id}"
-        
-        # Try subfolders starting from 1
-        subfolder_num = 1
-        while True:
-            if subfolder_num == 1:
-                # Try the main folder first
-                current_folder = base_folder
-            else:
-                # Try numbered subfolders
-                current_folder = f"{base_folder}_part{subfolder_num}"
-            
-            current_size = self.get_remote_folder_size(current_folder)
-            
-            # Check if file would fit in this folder
-            if current_size + file_size <= MAX_FOLDER_SIZE_BYTES:
-                return current_folder
-            
-            subfolder_num += 1
+    def list_dongle_files(self, dongles: List[Tuple[str, str]]) -> Dict[str, set]:
+        """List the files in the remote folders (dongle_id, dongle_id_partN) of the
+        given (device name, dongle_id) pairs.
+        
+        One rclone lsf of the remote, limited to those folders, instead of
+        one per folder. Returns {remote folder: set of file names}.
+        """
+        cmd = ["rclone", "lsf", self.remote_path, "--recursive", "--files-only"]
+        for device_name, dongle_id in dongles:
+            cmd.extend(["--include", f"/{device_name}/{dongle_id}/**",
+                        "--include", f"/{device_name}/{dongle_id}_part*/**"])
+        
+        folders = {}
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
             
-            # Safety check to avoid infinite loop
-            if subfolder_num > 100:
-                print(f"Warning: Too many subfolders for {base_folder}, using part{subfolder_num}")
-                return f"{base_folder}_part{subfolder_num}"
+            # Folders that don't exist yet simply have no files
+            if result.returncode == 0:
+                for line in result.stdout.splitlines():
+                    device_name, _, rest = line.strip().partition('/')
+                    folder, sep, name = rest.partition('/')
+                    if sep:
+                        folders.setdefault(f"{device_name}/{folder}", set()).add(name)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            pass
+        return folders
     
-    def group_files_by_size_limit(self, device_folder: Path) -> List[Tuple[str, List[Path]]]:
-        """Group files into subfolders based on size limits."""
-        files = []
-        for file_path in device_folder.rglob('*'):
-            if file_path.is_file() and any(ext in file_path.name.lower() 
-                                         for ext in ['.rlog', '.bz2', '.gz', '.zst']):
-                files.append(file_path)
-        
-        # Sort files by name for consistent grouping
-        files.sort(key=lambda x: x.name)
+    def group_files_by_size_limit(self, device_folder: Path,
+                                  remote_files: Optional[Dict[str, set]] = None,
+                                  files: Optional[List[Tuple[Path, int]]] = None) -> List[Tuple[str, List[Tuple[Path, int]]]]:
+        """Group files (with their sizes) into subfolders based on size limits.
         
-        groups = []
-        current_group = []
-        current_size = 0
-        group_num = 1
+        remote_files (see list_dongle_files) keeps files that are already
+        uploaded in the folder they are in; files, if given, is
+        iter_rlog_files' result for device_folder.
+        """
+        if files is None:
+            files = list(iter_rlog_files(device_folder))
+        if not files:
+            return []
         
         device_name = device_folder.parent.name
         dongle_id = device_folder.name
+        first_folder = f"{device_name}/{dongle_id}"
         
-        for file_path in files:
-            file_size = file_path.stat().st_size
-            
-            # If adding this file would exceed the limit, start a new group
-            if current_size + file_size > MAX_FOLDER_SIZE_BYTES and current_group:
-                if group_num == 1:
-                    folder_name = f"{device_name}/{dongle_id}"
-                else:
-                    folder_name = f"{device_name}/{dongle_id}_part{group_num}"
-                
-                groups.append((folder_name, current_group))
-                current_group = []
-                current_size = 0
-                group_num += 1
-            
-            current_group.append(file_path)
-            current_size += file_size
+        def folder_name(part):
+            return first_folder if part == 1 else f"{first_folder}_part{part}"
         
-        # Add the last group if it has files
-        if current_group:
-            if group_num == 1:
-                folder_name = f"{device_name}/{dongle_id}"
+        # Part number of the remote folder each uploaded file is in
+        uploaded = {}
+        for folder, names in (remote_files or {}).items():
+            suffix = folder[len(first_folder):]
+            if folder == first_folder:
+                part = 1
+            elif folder.startswith(first_folder) and suffix.startswith("_part") and suffix[5:].isdigit():
+                part = int(suffix[5:])
             else:
-                folder_name = f"{device_name}/{dongle_id}_part{group_num}"
-            groups.append((folder_name, current_group))
+                continue
+            for name in names:
+                uploaded.setdefault(name, part)
+        
+        # Usually everything fits in one folder (and nothing is in a part folder yet)
+        if (sum(size for _, size in files) <= MAX_FOLDER_SIZE_BYTES
+                and all(uploaded.get(path.name, 1) == 1 for path, _ in files)):
+            return [(first_folder, files)]
         
-        return groups
+        # Sort files by name for consistent grouping
+        files.sort(key=lambda x: x[0].name)
+        
+        # Uploaded files stay where they are, so they aren't uploaded again to
+        # another folder. The rest go first fit: each file into the first
+        # folder it still fits in, so room left at the end of a folder is used
+        # by smaller files later on instead of opening another part folder.
+        bins = {}  # part number -> [free bytes, files]
+        new_files = []
+        for file_path, file_size in files:
+            part = uploaded.get(file_path.name)
+            if part is None:
+                new_files.append((file_path, file_size))
+                continue
+            group = bins.setdefault(part, [MAX_FOLDER_SIZE_BYTES, []])
+            group[0] -= file_size
+            group[1].append((file_path, file_size))
+        
+        for file_path, file_size in new_files:
+            part = 1
+            while part in bins and bins[part][0] < file_size:
+                part += 1
+            group = bins.setdefault(part, [MAX_FOLDER_SIZE_BYTES, []])
+            group[0] -= file_size
+            group[1].append((file_path, file_size))
+        
+        return [(folder_name(part), bins[part][1]) for part in sorted(bins)]
     
-    def upload_files(self, files: List[Path], remote_folder: str) -> Dict[str, int]:
-        """Upload a list of files to a specific remote folder."""
-        stats = {'uploaded': 0, 'skipped': 0, 'failed': 0}
+    def upload_files(self, files: List[Path], remote_folder: str,
+                     existing_files: Optional[set] = None,
+                     pending: Optional[Dict[str, List[Path]]] = None) -> UploadStats:
+        """Upload a list of files to a specific remote folder.
+        
+        existing_files, if given, are the names already in the remote folder;
+        otherwise the folder is listed. With pending, the files to upload are
+        added to it by remote folder instead (see upload_pending).
+        """
+        stats = UploadStats()
         
         if not files:
             return stats
@@ -211,14 +266,15 @@ class RCloneUploader:
         print(f"Files to upload: {len(files)}")
         
         # Get list of existing files in remote folder
-        existing_files = self.list_remote_files(remote_folder)
+        if existing_files is None:
+            existing_files = self.list_remote_files(remote_folder)
         
         # Filter out files that already exist
         files_to_upload = []
         for file_path in files:
             if file_path.name in existing_files:
                 print(f"  ⏭️  Skipping existing file: {file_path.name}")
-                stats['skipped'] += 1
+                stats.skipped += 1
             else:
                 files_to_upload.append(file_path)
         
@@ -226,59 +282,156 @@ class RCloneUploader:
             print("  ✅ All files already exist, nothing to upload")
             return stats
         
-        # Create a temporary directory with the files to upload
-        temp_dir = Path(SCRIPT_DIR) / "temp_upload"
-        temp_dir.mkdir(exist_ok=True)
+        if pending is not None:
+            pending.setdefault(remote_folder, []).extend(files_to_upload)
+            print(f"  📤 {len(files_to_upload)} files queued for upload")
+            return stats
         
-        try:
-            # Copy files to temp directory
-            for file_path in files_to_upload:
-                temp_file = temp_dir / file_path.name
-                shutil.copy2(file_path, temp_file)
-            
-            # Upload using rclone
-            remote_dest = f"{self.remote_path}/{remote_folder}"
-            
-            cmd = [
-                "rclone", "copy",
-                str(temp_dir),
-                remote_dest,
-                "--progress",
-                "--transfers", "16",  # Parallel transfers
-                "--checkers", "16",   # Parallel file checks
-                "--tpslimit", "100",   # Transfers per second limit
-                "--retries", "3",    # Retry failed transfers
-                "--low-level-retries", "10",
-                "--stats", "30s",    # Stats every 30 seconds
-                "--stats-one-line"   # Compact stats
-            ]
-            
-            print(f"  📤 Starting upload of {len(files_to_upload)} files...")
-            
-            result = subprocess.run(cmd, capture_output=False, text=True)
-            
-            if result.returncode == 0:
-                stats['uploaded'] = len(files_to_upload)
-                print(f"  ✅ Successfully uploaded {len(files_to_upload)} files")
+        print(f"  📤 Starting upload of {len(files_to_upload)} files...")
+        failed = self.send_files(files_to_upload, remote_folder)
+        
+        stats.uploaded = len(files_to_upload) - failed
+        stats.failed = failed
+        if failed == 0:
+            print(f"  ✅ Successfully uploaded {len(files_to_upload)} files")
+        else:
+            print(f"  ❌ Upload failed for {failed} of {len(files_to_upload)} files")
+        
+        return stats
+    
+    def send_files(self, files: List[Path], remote_folder: str) -> int:
+        """Copy files into a remote folder; return how many failed."""
+        # rclone reads the files in place: one --files-from list per source
+        # directory instead of copying everything to a temp directory first
+        files_by_dir = {}
+        for file_path in files:
+            files_by_dir.setdefault(file_path.parent, []).append(file_path.name)
+        
+        remote_dest = f"{self.remote_path}/{remote_folder}"
+        return sum(self.copy_files(source_dir, names, remote_dest)
+                   for source_dir, names in files_by_dir.items())
+    
+    def upload_pending(self, pending: Dict[str, List[Path]]) -> UploadStats:
+        """Upload the files queued by upload_files, by remote folder.
+        
+        The files are hard-linked into a staging tree laid out like the remote
+        (device/dongle_id_partN/name) so one rclone copy uploads them all,
+        instead of an rclone process, with its own startup and auth, per folder.
+        """
+        stats = UploadStats()
+        total = sum(len(files) for files in pending.values())
+        if not total:
+            return stats
+        
+        print(f"\n📤 Uploading {total} files to {self.remote_path}...")
+        
+        # Next to rlogs/, so it's on the same filesystem
+        with tempfile.TemporaryDirectory(prefix=".upload-", dir=os.path.dirname(RLOGS_DIR)) as staging:
+            names = []
+            try:
+                for remote_folder, files in pending.items():
+                    folder = os.path.join(staging, remote_folder)
+                    os.makedirs(folder)
+                    for file_path in files:
+                        os.link(file_path, os.path.join(folder, file_path.name))
+                        names.append(f"{remote_folder}/{file_path.name}")
+            except OSError as e:
+                # No hard links here (e.g. a FAT/exFAT drive)
+                print(f"  ⚠️  Can't stage files for a single upload ({e}), uploading folder by folder")
+                failed = self.send_folders(pending)
             else:
-                stats['failed'] = len(files_to_upload)
-                print(f"  ❌ Upload failed for {len(files_to_upload)} files")
+                failed = self.copy_files(Path(staging), names, self.remote_path)
+        
+        stats.uploaded = total - failed
+        stats.failed = failed
+        if failed == 0:
+            print(f"  ✅ Successfully uploaded {total} files")
+        else:
+            print(f"  ❌ Upload failed for {failed} of {total} files")
+        return stats
+    
+    def send_folders(self, pending: Dict[str, List[Path]]) -> int:
+        """Upload each remote folder's files with its own rclone copy, a few at
+        once; return how many failed."""
+        max_workers = min(MAX_PARALLEL_DONGLES, len(pending))
+        # Several live progress displays would overwrite each other
+        self.show_progress = max_workers == 1
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.send_files, files, remote_folder)
+                       for remote_folder, files in pending.items()]
+            return sum(future.result() for future in as_completed(futures))
+    
+    def copy_files(self, source_dir: Path, names: List[str], remote_dest: str) -> int:
+        """Copy the named files from source_dir to remote_dest; return how many failed."""
+        # Written and closed before rclone opens it (Windows can't share an open temp file)
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as manifest:
+            manifest.write("\n".join(names) + "\n")
+        
+        cmd = [
+            "rclone", "copy",
+            str(source_dir),
+            remote_dest,
+            "--files-from-raw", manifest.name,  # exactly these files, no comment/whitespace parsing
+            "--no-traverse",     # they're known to be missing, don't list the destination
+            "--transfers", RCLONE_TRANSFERS,  # Parallel transfers
+            "--checkers", RCLONE_TRANSFERS,   # Parallel file checks
+            # Rlogs up to 64M go up in a single request instead of a resumable
+            # session; larger ones in 32M chunks (buffered in memory per transfer)
+            "--drive-upload-cutoff", "64M",
+            "--drive-chunk-size", "32M",
+            "--retries", "3",    # Retry failed transfers
+            "--low-level-retries", "10",
+            "--stats-one-line"   # Compact stats
+        ]
+        if self.show_progress:
+            # The progress display redraws every stats interval
+            cmd.extend(["--progress", "--stats", "5s"])
+        else:
+            # Without the progress display, log the periodic stats instead
+            # (less often, as parallel uploads share the terminal)
+            cmd.extend(["--stats", "30s", "--stats-log-level", "NOTICE"])
         
+        # Progress goes to the terminal; the log (stderr) is passed through
+        # line by line, noting the files rclone reports as failed:
+        # "ERROR : <name>: Failed to copy: <reason>"
+        failed_names = set()
+        try:
+            process = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True)
+            for line in process.stderr:
+                sys.stderr.write(line)
+                head, sep, _ = line.partition(": Failed to copy:")
+                if sep:
+                    failed_names.add(head.rpartition("ERROR : ")[2])
+            returncode = process.wait()
         finally:
-            # Clean up temp directory
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
+            os.unlink(manifest.name)
         
-        return stats
+        if returncode == 0:
+            return 0
+        # A failure that isn't per-file (auth, network) leaves nothing to count
+        return min(len(failed_names), len(names)) or len(names)
     
-    def upload_device_folder(self, device_folder: Path) -> Dict[str, int]:
-        """Upload all files from a device folder, splitting into subfolders as needed."""
-        total_stats = {'uploaded': 0, 'skipped': 0, 'failed': 0}
+    def upload_device_folder(self, device_folder: Path,
+                             remote_files: Optional[Dict[str, set]] = None,
+                             pending: Optional[Dict[str, List[Path]]] = None,
+                             file_groups: Optional[List[Tuple[str, List[Tuple[Path, int]]]]] = None) -> UploadStats:
+        """Upload all files from a device folder, splitting into subfolders as needed.
+        
+        remote_files, if given, is list_dongle_files' result covering this folder,
+        and file_groups group_files_by_size_limit's; pending is passed on to upload_files.
+        """
+        total_stats = UploadStats()
         
         print(f"\nProcessing device folder: {device_folder}")
         
+        # What's already uploaded, for all of the part folders at once
+        if remote_files is None:
+            remote_files = self.list_dongle_files([(device_folder.parent.name, device_folder.name)])
+        
         # Group files by size limit
-        file_groups = self.group_files_by_size_limit(device_folder)
+        if file_groups is None:
+            file_groups = self.group_files_by_size_limit(device_folder, remote_files)
         
         if not file_groups:
             print("  No rlog files found")
@@ -287,18 +440,17 @@ class RCloneUploader:
         print(f"  Split into {len(file_groups)} folder(s) due to size limits")
         
         for remote_folder, files in file_groups:
-            folder_size = sum(f.stat().st_size for f in files)
+            folder_size = sum(size for _, size in files)
             print(f"  📁 Folder: {remote_folder} ({folder_size / (1024*1024*1024):.2f} GB)")
             
-            stats = self.upload_files(files, remote_folder)
-            for key in total_stats:
-                total_stats[key] += stats[key]
+            total_stats += self.upload_files([path for path, _ in files], remote_folder,
+                                             remote_files.get(remote_folder, set()), pending)
         
         return total_stats
     
-    def upload_all(self) -> Dict[str, int]:
+    def upload_all(self) -> UploadStats:
         """Upload all rlog files from the rlogs directory."""
-        total_stats = {'uploaded': 0, 'skipped': 0, 'failed': 0}
+        total_stats = UploadStats()
         
         rlogs_path = Path(RLOGS_DIR)
         if not rlogs_path.exists():
@@ -314,14 +466,28 @@ class RCloneUploader:
         
         print(f"Found {len(device_folders)} device folder(s)")
         
-        for device_folder in device_folders:
-            # Process each dongle_id folder within the device
-            dongle_folders = [d for d in device_folder.iterdir() if d.is_dir()]
-            
-            for dongle_folder in dongle_folders:
-                stats = self.upload_device_folder(dongle_folder)
-                for key in total_stats:
-                    total_stats[key] += stats[key]
+        # Each dongle_id folder within each device uploads to its own remote folder
+        dongle_folders = [d for device_folder in device_folders
+                          for d in device_folder.iterdir() if d.is_dir()]
+        
+        if not dongle_folders:
+            return total_stats
+        
+        # What's already uploaded, for every dongle in one listing, fetched
+        # while the local folders are walked
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            listing = executor.submit(self.list_dongle_files,
+                                      [(d.parent.name, d.name) for d in dongle_folders])
+            local_files = [list(iter_rlog_files(d)) for d in dongle_folders]
+            remote_files = listing.result()
+        file_groups = [self.group_files_by_size_limit(d, remote_files, files)
+                       for d, files in zip(dongle_folders, local_files)]
+        
+        # Work out what's missing everywhere first, then upload it all together
+        pending = {}
+        for dongle_folder, groups in zip(dongle_folders, file_groups):
+            total_stats += self.upload_device_folder(dongle_folder, remote_files, pending, groups)
+        total_stats += self.upload_pending(pending)
         
         return total_stats
 
@@ -364,15 +530,15 @@ def main():
     # Print summary
     print("\n" + "=" * 40)
     print("Upload Summary:")
-    print(f"  Files uploaded: {stats['uploaded']}")
-    print(f"  Files skipped (already exist): {stats['skipped']}")
-    print(f"  Files failed: {stats['failed']}")
+    print(f"  Files uploaded: {stats.uploaded}")
+    print(f"  Files skipped (already exist): {stats.skipped}")
+    print(f"  Files failed: {stats.failed}")
     print(f"  Time elapsed: {elapsed_time / 60:.1f} minutes")
     
-    if stats['failed'] > 0:
-        print(f"\n⚠️  {stats['failed']} files failed to upload")
+    if stats.failed > 0:
+        print(f"\n⚠️  {stats.failed} files failed to upload")
         print("Check your internet connection and rclone configuration")
-    elif stats['uploaded'] > 0:
+    elif stats.uploaded > 0:
         print("\n✅ All files uploaded successfully!")
     else:
         print("\n✅ All files already exist on Google Drive!")